@@ -0,0 +1,189 @@
+"""bench.py
+Benchmarks for the Boggle solver hot path: loading the dictionary,
+building the prefix tree, binary search, boggle_solve with each
+search engine on boards from 4x4 up to 10x10, and scoring.
+
+Boards come from a seeded random corpus, so runs are comparable.
+Each phase runs once untimed (warmup), then --repeat times; the best
+time is reported.  Peak memory is measured in a separate pass with
+tracemalloc, which would otherwise slow the timed runs.
+
+    python bench.py [--boards N] [--seed S] [--sizes 4 5 6 ...] [--repeat R] [--json]
+
+With --json the results are printed as one JSON object, for saving
+and comparing across engines and releases.  --compare OLD.json reports
+each solve time relative to a saved run and flags regressions (on
+standard error with --json, so the JSON can still be saved).
+
+CS 210, Fall 2022
+by Alex JPS
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import boggler
+import config
+import generator
+import trie
+
+ENGINES = [boggler.RECURSIVE, boggler.ITERATIVE]
+
+# Bump when the set of measurements or their meaning changes
+FORMAT_VERSION = 1
+
+
+def best_time(action, repeat: int) -> float:
+    """Best of repeat timed runs of action(), in seconds, after one warmup run"""
+    action()
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        action()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_memory(action) -> int:
+    """Peak bytes allocated while running action()"""
+    tracemalloc.start()
+    try:
+        action()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def board_corpus(size: int, n_boards: int, seed: int) -> list[list[list[str]]]:
+    """n_boards random size x size boards, the same for the same seed"""
+    rng = random.Random(f"{seed}/{size}")
+    return [boggler.unpack_board(generator.random_board(size, size, rng), size, size)
+            for _ in range(n_boards)]
+
+
+def solve_all(boards: list[list[list[str]]], index: dict, engine: str) -> list[list[str]]:
+    """Solutions of each board"""
+    return [boggler.boggle_solve(board, index, engine=engine) for board in boards]
+
+
+def run_benchmarks(sizes: list[int], n_boards: int, seed: int, repeat: int) -> dict:
+    """Measure every phase; results as a JSON-ready dict.
+    Times are in milliseconds, memory in bytes.
+    """
+    dict_path = config.DICT_PATH
+    words = boggler.read_dict(dict_path)
+    index = trie.build(words)
+    results = {
+        "format": FORMAT_VERSION,
+        "python": platform.python_version(),
+        "dict_path": dict_path,
+        "words": len(words),
+        "seed": seed,
+        "boards_per_size": n_boards,
+        "repeat": repeat,
+        "phases": {},
+        "solve": []
+    }
+    phases = results["phases"]
+    phases["parse_dict_ms"] = 1000 * best_time(lambda: boggler.parse_dict(dict_path), repeat)
+    phases["read_dict_ms"] = 1000 * best_time(lambda: boggler.read_dict(dict_path), repeat)
+    phases["trie_build_ms"] = 1000 * best_time(lambda: trie.build(words), repeat)
+    phases["trie_build_peak_bytes"] = peak_memory(lambda: trie.build(words))
+
+    # Binary search over the sorted list, for whole words and prefixes
+    rng = random.Random(seed)
+    probes = rng.sample(words, min(1000, len(words)))
+    probes += [word[:len(word) // 2] for word in probes]
+    search_s = best_time(lambda: [boggler.search(probe, words) for probe in probes], repeat)
+    phases["search_us_per_call"] = 1e6 * search_s / len(probes)
+
+    for size in sizes:
+        boards = board_corpus(size, n_boards, seed)
+        solutions = solve_all(boards, index, boggler.RECURSIVE)
+        points = sum(boggler.score(words_found) for words_found in solutions)
+        score_s = best_time(lambda: [boggler.score(words_found) for words_found in solutions],
+                            repeat)
+        for engine in ENGINES:
+            assert solve_all(boards, index, engine) == solutions, \
+                f"{engine} engine disagrees on {size}x{size} boards"
+            elapsed = best_time(lambda: solve_all(boards, index, engine), repeat)
+            results["solve"].append({
+                "size": f"{size}x{size}",
+                "engine": engine,
+                "ms_per_board": 1000 * elapsed / n_boards,
+                "boards_per_sec": n_boards / elapsed,
+                "peak_bytes": peak_memory(lambda: solve_all(boards, index, engine)),
+                "score_us_per_board": 1e6 * score_s / n_boards,
+                "points": points
+            })
+    return results
+
+
+def print_report(results: dict):
+    """Human-readable version of run_benchmarks results"""
+    print(f"Python {results['python']}, {results['words']} words from {results['dict_path']}, "
+          f"seed {results['seed']}, best of {results['repeat']}")
+    for phase, value in results["phases"].items():
+        print(f"  {phase:<24}{value:>12.3f}" if isinstance(value, float)
+              else f"  {phase:<24}{value:>12}")
+    print(f"{'size':>6}{'engine':>11}{'ms/board':>10}{'boards/s':>10}"
+          f"{'peak KiB':>10}{'score us':>10}{'points':>8}")
+    for row in results["solve"]:
+        print(f"{row['size']:>6}{row['engine']:>11}{row['ms_per_board']:>10.3f}"
+              f"{row['boards_per_sec']:>10.0f}{row['peak_bytes'] / 1024:>10.1f}"
+              f"{row['score_us_per_board']:>10.2f}{row['points']:>8}")
+
+
+def compare(old: dict, new: dict, tolerance: float = 0.10, file=sys.stdout) -> int:
+    """Print (to file) each solve time in new relative to the same size
+    and engine in old; return the number more than tolerance (fraction) slower.
+    """
+    old_rows = {(row["size"], row["engine"]): row for row in old["solve"]}
+    regressions = 0
+    for row in new["solve"]:
+        before = old_rows.get((row["size"], row["engine"]))
+        if before is None:
+            continue
+        ratio = row["ms_per_board"] / before["ms_per_board"]
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  SLOWER"
+            regressions += 1
+        print(f"{row['size']:>6}{row['engine']:>11}{before['ms_per_board']:>10.3f}"
+              f"{row['ms_per_board']:>10.3f}{ratio:>8.2f}x{flag}", file=file)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Boggle solver")
+    parser.add_argument("--boards", type=int, default=100, help="boards per size (default 100)")
+    parser.add_argument("--seed", type=int, default=210, help="random seed (default 210)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(range(4, 11)),
+                        help="board sizes (default 4 through 10)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="timed runs per measurement, best is kept (default 3)")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--compare", metavar="OLD.json",
+                        help="compare solve times with results saved by --json")
+    args = parser.parse_args()
+    results = run_benchmarks(args.sizes, args.boards, args.seed, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+    if args.compare:
+        with open(args.compare) as file:
+            old = json.load(file)
+        # Keep standard output pure JSON with --json
+        report = sys.stderr if args.json else sys.stdout
+        print(f"{'size':>6}{'engine':>11}{'old ms':>10}{'new ms':>10}{'ratio':>9}", file=report)
+        if compare(old, results, file=report) > 0:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
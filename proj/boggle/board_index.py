@@ -0,0 +1,221 @@
+"""board_index.py
+Index a corpus of Boggle boards to answer "which boards contain
+this word?" without solving every board.
+
+A word can only be on a board if each pair of consecutive letters in
+it sits in two adjacent cells, and each letter appears on the board at
+least as often as in the word.  For every letter pair (and letter count)
+the index keeps a bitset, as a Python int, of the boards that have it.
+ANDing the bitsets for a word's pairs and counts leaves a few candidate
+boards, and only those get a path search.  The same test run the
+other way round (the word's pairs against one board's pairs) screens
+a word list for a single board.
+
+    python board_index.py BOARDS_FILE WORD ...
+
+CS 210, Fall 2022
+by Alex JPS
+"""
+import collections
+import sys
+from typing import Iterable
+
+import boggler
+import config
+
+ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+LETTERS = frozenset(ALPHABET)
+# Bit number of each ordered pair of letters, e.g. "QU"
+PAIR_BIT = {a + b: 26 * i + j for i, a in enumerate(ALPHABET) for j, b in enumerate(ALPHABET)}
+
+
+def board_pairs(letters: str, n_rows: int, n_cols: int) -> int:
+    """Bitmask (by PAIR_BIT) of the letter pairs in adjacent cells
+    of the board, in either order.
+
+    >>> mask = board_pairs("ABCD", 2, 2)
+    >>> bool(mask & (1 << PAIR_BIT["AD"])), bool(mask & (1 << PAIR_BIT["DA"]))
+    (True, True)
+    >>> bool(mask & (1 << PAIR_BIT["AA"]))
+    False
+    """
+    mask = 0
+    for cell, adjacent in enumerate(boggler.neighbors(n_rows, n_cols)):
+        for other, _ in adjacent:
+            mask |= 1 << PAIR_BIT[letters[cell] + letters[other]]
+    return mask
+
+
+def word_pairs(word: str) -> int:
+    """Bitmask (by PAIR_BIT) of consecutive letter pairs in word
+
+    >>> word_pairs("ABA") == (1 << PAIR_BIT["AB"]) | (1 << PAIR_BIT["BA"])
+    True
+    """
+    mask = 0
+    for i in range(len(word) - 1):
+        mask |= 1 << PAIR_BIT[word[i:i + 2]]
+    return mask
+
+
+def has_path(letters: str, n_rows: int, n_cols: int, word: str) -> bool:
+    """Can word be spelled by a path of adjacent, unrepeated cells?
+
+    >>> has_path("PLXXMEXXXAXXSXXX", 4, 4, "SAMPLE")
+    True
+    >>> has_path("PLXXMEXXXAXXSXXX", 4, 4, "MAPLE")
+    False
+    """
+    adjacent = boggler.neighbors(n_rows, n_cols)
+    last = len(word) - 1
+
+    def extend(cell: int, position: int, visited: int) -> bool:
+        """Does a path spelling word[position + 1:] continue from cell?"""
+        if position == last:
+            return True
+        letter = word[position + 1]
+        for next_cell, bit in adjacent[cell]:
+            if (not visited & bit and letters[next_cell] == letter
+                    and extend(next_cell, position + 1, visited | bit)):
+                return True
+        return False
+
+    for cell, letter in enumerate(letters):
+        if letter == word[0] and extend(cell, 0, 1 << cell):
+            return True
+    return False
+
+
+def ids(bitset: int) -> list[int]:
+    """Positions of the set bits in bitset, in increasing order.
+    Scanning its bytes keeps this linear in the length of bitset,
+    however many bits are set.
+
+    >>> ids(0b100101)
+    [0, 2, 5]
+    """
+    result = []
+    for byte_i, byte in enumerate(bitset.to_bytes((bitset.bit_length() + 7) // 8, "little")):
+        if byte:
+            for bit_i in range(8):
+                if byte >> bit_i & 1:
+                    result.append(8 * byte_i + bit_i)
+    return result
+
+
+class BoardCorpus:
+    """Boards of n_rows x n_cols letters, indexed by letter pairs and counts.
+
+    >>> corpus = BoardCorpus(["PLXXMEXXXAXXSXXX", "SAMPXXXLXXXEXXXX", "MAPLXXXEXXXXXXXX"])
+    >>> corpus.boards_containing("SAMPLE")
+    ['PLXXMEXXXAXXSXXX', 'SAMPXXXLXXXEXXXX']
+    >>> corpus.boards_containing("MAPLE")
+    ['MAPLXXXEXXXXXXXX']
+    >>> corpus.boards_containing("ice-cream"), corpus.boards_containing("café")
+    ([], [])
+    >>> corpus.words_on(0, boggler.read_dict("data/dict.txt"))[:4]
+    ['AMP', 'AMPLE', 'AXE', 'AXLE']
+    """
+
+    def __init__(self, boards: Iterable[str] = (),
+                 n_rows: int = config.N_ROWS, n_cols: int = config.N_COLS):
+        self.n_rows = n_rows
+        self.n_cols = n_cols
+        self.boards = []        # Board strings; a board's id is its position
+        self.pairs = []         # Letter pair mask of each board
+        # Ids of the boards with each letter pair (by PAIR_BIT), and with
+        # at least n of each letter (by (letter, n))
+        self.ids_with = collections.defaultdict(list)
+        # The same as bitsets, built when first needed after an add
+        self.bitsets = None
+        for board in boards:
+            self.add(board)
+
+    def add(self, board: str) -> int:
+        """Add a board string to the corpus; returns its id"""
+        board = boggler.normalize(board)
+        assert len(board) == self.n_rows * self.n_cols, \
+            f"Board should have {self.n_rows * self.n_cols} letters, got {board}"
+        assert set(board) <= LETTERS, f"Board should have only letters A-Z, got {board}"
+        board_id = len(self.boards)
+        pairs = board_pairs(board, self.n_rows, self.n_cols)
+        self.boards.append(board)
+        self.pairs.append(pairs)
+        while pairs:
+            low_bit = pairs & -pairs
+            self.ids_with[low_bit.bit_length() - 1].append(board_id)
+            pairs ^= low_bit
+        for letter, count in collections.Counter(board).items():
+            for n in range(1, count + 1):
+                self.ids_with[(letter, n)].append(board_id)
+        self.bitsets = None
+        return board_id
+
+    def _bitsets(self) -> dict:
+        """Bitset of boards for each key of ids_with.  Setting bits in a
+        bytearray and converting once per key avoids the quadratic cost
+        of OR-ing each new board into ever longer ints.
+        """
+        if self.bitsets is None:
+            n_bytes = (len(self.boards) + 7) // 8
+            self.bitsets = {}
+            for key, ids in self.ids_with.items():
+                bits = bytearray(n_bytes)
+                for board_id in ids:
+                    bits[board_id >> 3] |= 1 << (board_id & 7)
+                self.bitsets[key] = int.from_bytes(bits, "little")
+        return self.bitsets
+
+    def candidates(self, word: str) -> int:
+        """Bitset of boards that pass the pair and count screens for word"""
+        word = boggler.normalize(word)
+        if (not boggler.allowed(word) or not set(word) <= LETTERS
+                or len(word) > self.n_rows * self.n_cols):
+            return 0
+        bitsets = self._bitsets()
+        found = (1 << len(self.boards)) - 1
+        for letter, count in collections.Counter(word).items():
+            found &= bitsets.get((letter, count), 0)
+        pairs = word_pairs(word)
+        while pairs and found:
+            low_bit = pairs & -pairs
+            found &= bitsets.get(low_bit.bit_length() - 1, 0)
+            pairs ^= low_bit
+        return found
+
+    def boards_containing(self, word: str) -> list[str]:
+        """Boards in the corpus on which word can be spelled"""
+        word = boggler.normalize(word)
+        result = []
+        for board_id in ids(self.candidates(word)):
+            board = self.boards[board_id]
+            if has_path(board, self.n_rows, self.n_cols, word):
+                result.append(board)
+        return result
+
+    def words_on(self, board_id: int, words: Iterable[str]) -> list[str]:
+        """The words (e.g., from boggler.read_dict) on board board_id, in
+        sorted order, path-searching only those that pass its pair screen.
+        """
+        board = self.boards[board_id]
+        pairs = self.pairs[board_id]
+        letters = set(board)
+        return sorted(word for word in words
+                      if (set(word) <= letters and word_pairs(word) & ~pairs == 0
+                          and has_path(board, self.n_rows, self.n_cols, word)))
+
+
+def main():
+    if len(sys.argv) < 3:
+        print(f"Usage: {sys.argv[0]} BOARDS_FILE WORD ...", file=sys.stderr)
+        sys.exit(2)
+    corpus = BoardCorpus(boggler.read_boards(sys.argv[1]))
+    for word in sys.argv[2:]:
+        boards = corpus.boards_containing(word)
+        print(f"{boggler.normalize(word)}: {len(boards)} boards")
+        for board in boards:
+            print(f"  {board}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,76 @@
 """Graphic display of Boggle board"""
+import time
 from typing import Optional
 
-import graphics.grid as grid_view
+import config
 
-COLOR_UNUSED = grid_view.tile_background
-COLOR_IN_USE = grid_view.tile_accent_background
+# The graphics package is imported by display, so that solving
+# without a display never starts Tk.
+grid_view = None
+COLOR_UNUSED = None
+COLOR_IN_USE = None
 
-VIEW: Optional[grid_view.Grid] = None
+VIEW: Optional["grid_view.Grid"] = None
 
 def display(board: list[list[str]],
             width: int = 500, height: int = 500,
             title="BOGGLER"):
     """Create a graphical representation of the Boggle board.
-    We cache the model component (board) so we can reuse it when
-    calls are made to occupy or leave a cell.
+    We cache the model component (board) so an Animation can
+    reuse it when the search occupies or leaves a cell.
     """
-    global VIEW
-    VIEW = grid_view.Grid(len(board), len(board[0]), title="BOGGLER")
+    global VIEW, grid_view, COLOR_UNUSED, COLOR_IN_USE
+    import graphics.grid as grid_view
+    COLOR_UNUSED = grid_view.tile_background
+    COLOR_IN_USE = grid_view.tile_accent_background
+    VIEW = grid_view.Grid(len(board), len(board[0]), title="BOGGLER",
+                          autoflush=False)
     for row_i in range(len(board)):
         for col_i in range(len(board[0])):
             VIEW.fill_cell(row_i, col_i, COLOR_UNUSED)
             VIEW.label_cell(row_i, col_i, board[row_i][col_i])
+    grid_view.update()
 
-def mark_occupied(row: int, col: int):
-    """Mark board[row][col] as occupied in display"""
-    if VIEW:
-        VIEW.fill_cell(row, col, color=COLOR_IN_USE)
 
-def mark_unoccupied(row: int, col: int):
-    """Mark board[row][col] as unoccupied (available)"""
-    if VIEW:
-        VIEW.fill_cell(row, col, color=COLOR_UNUSED)
+class Animation:
+    """Observer for boggler.boggle_solve that shows the search on
+    the display at most frame_rate times per second.  Between frames
+    it only records which cells are occupied; each frame recolors just
+    the cells that changed since the last one.  frame_rate 0 redraws
+    on every step.
+    """
+
+    def __init__(self, frame_rate: int = config.FRAME_RATE):
+        self.frame_interval = 1 / frame_rate if frame_rate else 0
+        self.next_frame = 0.0
+        self.occupied = set()   # Cells occupied by the search
+        self.shown = set()      # Cells currently drawn as occupied
+
+    def mark_occupied(self, row: int, col: int):
+        self.occupied.add((row, col))
+        self._tick()
+
+    def mark_unoccupied(self, row: int, col: int):
+        self.occupied.discard((row, col))
+        self._tick()
+
+    def _tick(self):
+        """Draw a frame if one is due"""
+        now = time.monotonic()
+        if now >= self.next_frame:
+            self.flush()
+            self.next_frame = now + self.frame_interval
+
+    def flush(self):
+        """Bring the display up to date with the search"""
+        if not VIEW:
+            return
+        for row, col in self.shown - self.occupied:
+            VIEW.fill_cell(row, col, color=COLOR_UNUSED)
+        for row, col in self.occupied - self.shown:
+            VIEW.fill_cell(row, col, color=COLOR_IN_USE)
+        self.shown = set(self.occupied)
+        grid_view.update()
 
 
 def prompt_to_close():
@@ -40,5 +80,3 @@ def prompt_to_close():
         input("Press enter to close display")
         VIEW.win.close()
         VIEW = None
-
-
@@ -5,10 +5,17 @@ CS 210, Fall 2022
 2022-11-07
 by Alex JPS
 """
+import argparse
 import doctest
+import functools
+import multiprocessing
 import sys
+from typing import Iterable, Iterator
+
 import config
 import board_view
+import dict_cache
+import trie
 
 # Configuration symbolic constants
 MIN_WORD = config.MIN_WORD
@@ -21,18 +28,33 @@ NOPE = "Nope"       # Not a match, nor a prefix of a match
 MATCH = "Match"     # Exact match to a valid word
 PREFIX ="Prefix"   # Not an exact match, but a prefix (keep searching!)
 
-# Special char for position in use
-IN_USE = "@"
+# Search engines for boggle_solve
+RECURSIVE = "recursive"   # Depth-first search by recursive calls
+ITERATIVE = "iterative"   # Depth-first search with an explicit stack
 
 # Point values
 POINTS = [0, 0, 0, 1, 1, 2, 3, 5, 11, 11, 11, 11, 11, 11, 11, 11, 11 ]
 
 def read_dict(path: str) -> list[str]:
     """Returns ordered list of valid, normalized words from dictionary.
+    The list is cached beside the dictionary (see dict_cache), so only
+    the first call after the dictionary changes reads it in full.
 
     >>> read_dict("data/shortdict.txt")
     ['ALPHA', 'BETA', 'DELTA', 'GAMMA', 'OMEGA']
     """
+    result = dict_cache.load(path, MIN_WORD)
+    if result is None:
+        result = parse_dict(path)
+        dict_cache.save(path, MIN_WORD, result)
+    return result
+
+def parse_dict(path: str) -> list[str]:
+    """Read, normalize, filter and sort the dictionary at path (no cache)
+
+    >>> parse_dict("data/shortdict.txt")
+    ['ALPHA', 'BETA', 'DELTA', 'GAMMA', 'OMEGA']
+    """
     result = []
     with open(path, newline="") as file:
         for row in file:
@@ -112,79 +134,199 @@ def get_board_letters() -> str:
             sys.exit(0)
         else:
             print(f'"{board_string}" is not a valid Boggle board')
-            print(f'Please enter exactly 16 letters (or empty to quit)')
+            print(f'Please enter exactly {BOARD_SIZE} letters (or empty to quit)')
 
-def unpack_board(letters: str) -> list[list[str]]:
+def unpack_board(letters: str, n_rows: int = N_ROWS, n_cols: int = N_COLS) -> list[list[str]]:
     """Unpack a single string of characters into
-    a matrix of individual characters, N_ROWS x N_COLS.
+    a matrix of individual characters, n_rows x n_cols.
 
     >>> unpack_board("abcdefghijklmnop")
     [['a', 'b', 'c', 'd'], ['e', 'f', 'g', 'h'], ['i', 'j', 'k', 'l'], ['m', 'n', 'o', 'p']]
+    >>> unpack_board("abcdef", 2, 3)
+    [['a', 'b', 'c'], ['d', 'e', 'f']]
     """
     result = []
-    for i in range(N_ROWS):
+    for i in range(n_rows):
         result.append([])
-        for j in range(N_COLS):
-            index = i * N_ROWS + j
+        for j in range(n_cols):
+            index = i * n_cols + j
             result[-1].append(letters[index])
     return result
 
-def boggle_solve(board: list[list[str]], words: list[str]) -> list[str]:
+@functools.lru_cache(maxsize=None)
+def neighbors(n_rows: int, n_cols: int) -> tuple[tuple[tuple[int, int], ...], ...]:
+    """Adjacency table for a board of n_rows x n_cols cells numbered
+    row by row (cell = row * n_cols + col).  Entry cell lists
+    (neighbor, 1 << neighbor) for each of the up to 8 cells touching
+    cell, excluding cell itself; the second item is the neighbor's bit
+    in a visited-cells bitmask.
+
+    >>> [cell for cell, bit in neighbors(3, 3)[0]]
+    [1, 3, 4]
+    >>> [cell for cell, bit in neighbors(3, 3)[4]]
+    [0, 1, 2, 3, 5, 6, 7, 8]
+    >>> neighbors(3, 3)[8][0]
+    (4, 16)
+    """
+    table = []
+    for row in range(n_rows):
+        for col in range(n_cols):
+            adjacent = []
+            for d_row in (-1, 0, 1):
+                for d_col in (-1, 0, 1):
+                    n_row, n_col = row + d_row, col + d_col
+                    if ((d_row, d_col) != (0, 0)
+                            and 0 <= n_row < n_rows and 0 <= n_col < n_cols):
+                        cell = n_row * n_cols + n_col
+                        adjacent.append((cell, 1 << cell))
+            table.append(tuple(adjacent))
+    return tuple(table)
+
+def boggle_solve(board: list[list[str]], words: list[str] | dict,
+                 observer=None, engine: str = RECURSIVE) -> list[str]:
     """Find all the words that can be made by traversing
     the boggle board in all 8 directions.  Returns sorted list without
-    duplicates.
+    duplicates.  words may be the sorted word list from read_dict or,
+    better when solving many boards, a prefix tree from trie.build.
+    The board may be any size, e.g., 5x5 or 6x6 Big Boggle.
+
+    observer, if given, is told as the search enters and leaves each
+    cell through its mark_occupied(row, col) and mark_unoccupied(row, col)
+    methods (e.g., board_view.Animation()).  Without an observer the
+    search makes no such calls at all.
+
+    engine chooses the search: RECURSIVE or ITERATIVE.  Both find the
+    same words.
 
     >>> board = unpack_board("PLXXMEXXXAXXSXXX")
     >>> words = read_dict("data/dict.txt")
     >>> boggle_solve(board, words)
     ['AMP', 'AMPLE', 'AXE', 'AXLE', 'ELM', 'EXAM', 'LEA', 'MAX', 'PEA', 'PLEA', 'SAME', 'SAMPLE', 'SAX']
+    >>> boggle_solve(board, trie.build(words)) == boggle_solve(board, words)
+    True
+    >>> boggle_solve(unpack_board("PLXXXMEXXXXAXXXSXXXXXXXXX", 5, 5), words) == boggle_solve(board, words)
+    True
+    >>> boggle_solve(board, words, engine=ITERATIVE) == boggle_solve(board, words)
+    True
+    """
+    if isinstance(words, list):
+        index = trie.build(words)
+    else:
+        index = words
+    # Flat copy of the board, cell = row * n_cols + col
+    letters = [letter for row in board for letter in row]
+    adjacent = neighbors(len(board), len(board[0]))
+    if engine == RECURSIVE:
+        solutions = _solve_recursive(letters, adjacent, index, len(board[0]), observer)
+    elif engine == ITERATIVE:
+        solutions = _solve_iterative(letters, adjacent, index, len(board[0]), observer)
+    else:
+        raise ValueError(f"Unknown search engine '{engine}'")
+    if observer is not None and hasattr(observer, "flush"):
+        observer.flush()
+
+    # Return solutions without duplicates, in sorted order
+    solutions = list(set(solutions))
+    return sorted(solutions)
+
+def _solve_recursive(letters: list[str], adjacent: tuple, index: dict,
+                     n_cols: int, observer) -> list[str]:
+    """Words (possibly repeated) found by recursive depth-first
+    search of the flattened board letters.
     """
     solutions = []
 
-    def solve(row: int, col: int, prefix: str):
-        """One solution step"""
-        if row in range(N_ROWS) and col in range(N_COLS):
-            # in the board
-            letter = board[row][col]
-            if letter != IN_USE:
-                # not in use
-                prefix = prefix + letter
-                status = search(prefix, words)
-                if status == NOPE:
-                    pass
-                if status == MATCH:
-                    solutions.append(prefix)
-                if status == MATCH or status == PREFIX:
-                    # Keep searching
-                    board[row][col] = IN_USE  # Prevent reusing
-                    board_view.mark_occupied(row, col)
-                    # Recursive calls to surrounding cells
-                    for d_row in [0, -1, 1]:
-                        for d_col in [0, -1, 1]:
-                            solve(row + d_row, col + d_col, prefix)
-                    # Restore letter for further search
-                    board[row][col] = letter
-                    board_view.mark_unoccupied(row, col)
-                else:
-                    pass
-            else:
-                pass
-        else:
-            pass
+    def solve(cell: int, node: dict, visited: int):
+        """One solution step.  The path so far ends at cell and
+        spells the prefix for node; visited has a bit set for each
+        cell on the path, including cell.
+        """
+        if trie.END in node:
+            solutions.append(node[trie.END])
+        for next_cell, bit in adjacent[cell]:
+            if not visited & bit:
+                child = node.get(letters[next_cell])
+                if child is not None:
+                    solve(next_cell, child, visited | bit)
+
+    def solve_observed(cell: int, node: dict, visited: int):
+        """solve, reporting each step to the observer"""
+        row, col = divmod(cell, n_cols)
+        observer.mark_occupied(row, col)
+        if trie.END in node:
+            solutions.append(node[trie.END])
+        for next_cell, bit in adjacent[cell]:
+            if not visited & bit:
+                child = node.get(letters[next_cell])
+                if child is not None:
+                    solve_observed(next_cell, child, visited | bit)
+        observer.mark_unoccupied(row, col)
 
     # Look for solutions starting from each board position
-    for row_i in range(N_ROWS):
-        for col_i in range(N_COLS):
-            solve(row_i, col_i, "")
+    start = solve if observer is None else solve_observed
+    for cell, letter in enumerate(letters):
+        node = index.get(letter)
+        if node is not None:
+            start(cell, node, 1 << cell)
+    return solutions
 
-    # Return solutions without duplicates, in sorted order
-    solutions = list(set(solutions))
-    return sorted(solutions)
+def _solve_iterative(letters: list[str], adjacent: tuple, index: dict,
+                     n_cols: int, observer) -> list[str]:
+    """Words (possibly repeated) found by depth-first search of the
+    flattened board letters, keeping pending paths on an explicit
+    stack of (cell, node, visited) instead of in Python call frames.
+    """
+    solutions = []
+    end = trie.END
+    stack = []
+    for cell, letter in enumerate(letters):
+        node = index.get(letter)
+        if node is not None:
+            stack.append((cell, node, 1 << cell))
+
+    if observer is None:
+        pop = stack.pop
+        push = stack.append
+        while stack:
+            cell, node, visited = pop()
+            if end in node:
+                solutions.append(node[end])
+            for next_cell, bit in adjacent[cell]:
+                if not visited & bit:
+                    child = node.get(letters[next_cell])
+                    if child is not None:
+                        push((next_cell, child, visited | bit))
+        return solutions
+
+    # With an observer, a (cell, None, 0) entry below a cell's
+    # extensions marks the point where the search leaves that cell.
+    while stack:
+        cell, node, visited = stack.pop()
+        row, col = divmod(cell, n_cols)
+        if node is None:
+            observer.mark_unoccupied(row, col)
+            continue
+        observer.mark_occupied(row, col)
+        if end in node:
+            solutions.append(node[end])
+        stack.append((cell, None, 0))
+        for next_cell, bit in adjacent[cell]:
+            if not visited & bit:
+                child = node.get(letters[next_cell])
+                if child is not None:
+                    stack.append((next_cell, child, visited | bit))
+    return solutions
 
 def word_score(word: str) -> int:
-    """Standard point value in Boggle"""
-    assert len(word) <= 16
-    return POINTS[len(word)]
+    """Standard point value in Boggle; words longer than
+    the POINTS table (possible on big boards) score its last value.
+
+    >>> word_score("ALPHA")
+    2
+    >>> word_score("INCOMPREHENSIBILITIES")
+    11
+    """
+    return POINTS[min(len(word), len(POINTS) - 1)]
 
 def score(solutions: list[str]) -> int:
     """Sum of scores for each solution
@@ -197,18 +339,116 @@ def score(solutions: list[str]) -> int:
         points += word_score(i)
     return points
 
+# Prefix tree used by solve_many worker processes.  It is set before the
+# pool starts, so forked workers inherit it instead of unpickling a copy
+# with every task.
+_worker_index: dict = {}
+
+def _init_worker(index: dict):
+    """Pool initializer where workers cannot be forked (e.g., Windows)"""
+    global _worker_index
+    _worker_index = index
+
+def _solve_one(board_string: str, engine: str = RECURSIVE,
+               index: dict | None = None) -> tuple[str, list[str], int]:
+    """Solve and score one board against index, by default the worker's prefix tree"""
+    if index is None:
+        index = _worker_index
+    solutions = boggle_solve(unpack_board(board_string), index, engine=engine)
+    return board_string, solutions, score(solutions)
+
+def solve_many(boards: Iterable[str], words: list[str] | dict,
+               workers: int = 1, chunksize: int = 32,
+               engine: str = RECURSIVE) -> Iterator[tuple[str, list[str], int]]:
+    """Solve each board string, yielding (board, solutions, points)
+    in the same order as boards, as soon as each result is ready.
+    With workers > 1 the boards are spread over a process pool that
+    shares a single prefix tree.
+
+    >>> words = read_dict("data/dict.txt")
+    >>> for board, solutions, points in solve_many(["PLXXMEXXXAXXSXXX", "xxxxxxxxxxxxxxxx"], words):
+    ...     print(board, len(solutions), points)
+    PLXXMEXXXAXXSXXX 13 16
+    XXXXXXXXXXXXXXXX 0 0
+    """
+    global _worker_index
+    if isinstance(words, list):
+        words = trie.build(words)
+    boards = (normalize(board) for board in boards)
+    if workers <= 1:
+        yield from map(functools.partial(_solve_one, engine=engine, index=words), boards)
+        return
+    solve_one = functools.partial(_solve_one, engine=engine)
+    if "fork" in multiprocessing.get_all_start_methods():
+        _worker_index = words
+        pool = multiprocessing.get_context("fork").Pool(workers)
+    else:
+        pool = multiprocessing.Pool(workers, _init_worker, (words,))
+    with pool:
+        yield from pool.imap(solve_one, boards, chunksize)
+
+def read_boards(path: str) -> Iterator[str]:
+    """Board strings from a file with one board per line
+    ("-" for standard input).  Blank lines are ignored;
+    invalid boards are reported and skipped.
+    """
+    file = sys.stdin if path == "-" else open(path, newline="")
+    try:
+        for line_num, line in enumerate(file, start=1):
+            board_string = line.strip()
+            if len(board_string) == 0:
+                continue
+            if allowed(board_string) and len(board_string) == BOARD_SIZE:
+                yield board_string
+            else:
+                print(f'{path}:{line_num}: "{board_string}" is not a valid Boggle board',
+                      file=sys.stderr)
+    finally:
+        if file is not sys.stdin:
+            file.close()    # Standard input is not ours to close
+
+def batch_main(boards_path: str, workers: int, engine: str = RECURSIVE):
+    """Solve every board in a file, printing one line per board
+    (board, points, words) followed by a total.
+    """
+    words = trie.build(read_dict(config.DICT_PATH))
+    n_boards = 0
+    total = 0
+    for board_string, solutions, points in solve_many(read_boards(boards_path), words, workers,
+                                                        engine=engine):
+        print(board_string, points, " ".join(solutions), flush=True)
+        n_boards += 1
+        total += points
+    print(f"{n_boards} boards, {total} points")
+
 def main():
-    words = read_dict(config.DICT_PATH)
+    words = trie.build(read_dict(config.DICT_PATH))
     board_string = get_board_letters()
     board_string = normalize(board_string)
     board = unpack_board(board_string)
     board_view.display(board)
-    solutions = boggle_solve(board, words)
+    solutions = boggle_solve(board, words, board_view.Animation())
     board_view.prompt_to_close()
     print(solutions)
     print(f"{score(solutions)} points")
 
+def cli() -> argparse.Namespace:
+    """Command line options"""
+    parser = argparse.ArgumentParser(description="Boggle game solver")
+    parser.add_argument("--boards", metavar="FILE",
+                        help=f"solve {BOARD_SIZE}-letter boards, one per line, "
+                             "from FILE ('-' for stdin) instead of asking for one")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of solver processes for --boards (default 1)")
+    parser.add_argument("--engine", choices=[RECURSIVE, ITERATIVE], default=RECURSIVE,
+                        help=f"search engine for --boards (default {RECURSIVE})")
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    doctest.testmod()
-    print("Doctests complete")
-    main()
+    args = cli()
+    if args.boards:
+        batch_main(args.boards, args.workers, args.engine)
+    else:
+        doctest.testmod()
+        print("Doctests complete")
+        main()
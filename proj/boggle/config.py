@@ -10,3 +10,9 @@ MIN_WORD = 3
 N_ROWS = 4
 N_COLS = N_ROWS
 BOARD_SIZE = N_ROWS * N_COLS
+
+# Display: redraws per second while solving (0 to redraw every step)
+FRAME_RATE = 30
+
+# Solutions remembered by a solution_cache.SolutionCache
+SOLUTION_CACHE_SIZE = 10000
@@ -0,0 +1,70 @@
+"""dict_cache.py
+On-disk cache of the normalized, filtered, sorted word list
+that boggler.read_dict produces, so that short-lived solver
+processes don't re-read and re-sort the dictionary on every start.
+
+The cache for data/dict.txt is data/dict.txt.cache: one header line
+identifying the source file (modification time and size) and the
+MIN_WORD setting it was built with, followed by the words, one per
+line.  A cache whose header does not match is ignored and rebuilt,
+so editing the dictionary, pointing config.DICT_PATH at another file,
+or changing MIN_WORD never serves stale words.
+
+CS 210, Fall 2022
+by Alex JPS
+"""
+import os
+
+# Bump when the file layout changes
+VERSION = 1
+MAGIC = "boggler-dict"
+
+
+def cache_path(path: str) -> str:
+    """Where the cached word list for dictionary path lives"""
+    return path + ".cache"
+
+
+def signature(path: str, min_word: int) -> str:
+    """Cache header line identifying the dictionary at path, as it is now,
+    filtered with min_word
+    """
+    stat = os.stat(path)
+    return f"{MAGIC} {VERSION} {stat.st_mtime_ns} {stat.st_size} {min_word}"
+
+
+def load(path: str, min_word: int) -> list[str] | None:
+    """The cached word list for dictionary path, or None if there
+    is no cache or it is out of date.
+    """
+    try:
+        with open(cache_path(path), "rb") as file:
+            blob = file.read()
+    except OSError:
+        return None
+    header, _, body = blob.decode("ascii", errors="replace").partition("\n")
+    if header != signature(path, min_word):
+        return None
+    if len(body) == 0:
+        return []
+    return body.split("\n")
+
+
+def save(path: str, min_word: int, words: list[str]):
+    """Cache words for dictionary path.  The cache is written to a
+    temporary file and renamed into place, so concurrent solvers never
+    read a partial cache.  Failure to write (e.g., a read-only data
+    directory) is not an error; we just don't get a cache.
+    """
+    target = cache_path(path)
+    temp = f"{target}.{os.getpid()}.tmp"
+    try:
+        with open(temp, "w", encoding="ascii", newline="") as file:
+            file.write(signature(path, min_word) + "\n")
+            file.write("\n".join(words))
+        os.replace(temp, target)
+    except (OSError, UnicodeEncodeError):
+        try:
+            os.remove(temp)
+        except OSError:
+            pass
@@ -0,0 +1,179 @@
+"""generator.py
+Generate random Boggle boards whose score falls in a target range.
+
+Simulated annealing: starting from a random board, repeatedly swap two
+letters (or replace one), keep the change if it brings the score closer
+to the target range, and sometimes keep it anyway while the "temperature"
+is high, so the search can climb out of dead ends.
+
+Each candidate differs from the current board in only one or two
+cells, but a board not seen before is still solved from scratch, with
+boggle_solve against one shared prefix tree (and the neighbor table it
+caches per board size).  What carries over between candidates: the
+board stays in one letter list that moves edit in place, a rejected
+move is undone without solving anything, and the scores of recently
+evaluated boards are remembered, since annealing often swaps back to
+a board it has already seen.
+
+    python generator.py --low 100 --high 150 --count 10
+
+CS 210, Fall 2022
+by Alex JPS
+"""
+import argparse
+import collections
+import doctest
+import math
+import random
+
+import boggler
+import config
+import trie
+
+# Approximate English letter frequencies (per 1000 letters), so
+# random boards have a realistic number of words on them.
+LETTER_WEIGHTS = {
+    "A": 82, "B": 15, "C": 28, "D": 43, "E": 127, "F": 22, "G": 20,
+    "H": 61, "I": 70, "J": 2, "K": 8, "L": 40, "M": 24, "N": 67,
+    "O": 75, "P": 19, "Q": 1, "R": 60, "S": 63, "T": 91, "U": 28,
+    "V": 10, "W": 24, "X": 2, "Y": 20, "Z": 1
+}
+
+# Annealing schedule
+START_TEMPERATURE = 8.0     # Initial temperature, in points of distance from the range
+REPLACE_RATE = 0.3          # Fraction of moves that replace rather than swap a letter
+
+
+def random_board(n_rows: int, n_cols: int, rng: random.Random) -> str:
+    """A board string of n_rows * n_cols letters drawn with English frequencies"""
+    return "".join(rng.choices(list(LETTER_WEIGHTS), weights=list(LETTER_WEIGHTS.values()),
+                               k=n_rows * n_cols))
+
+
+class Scorer:
+    """Scores boards against one prefix tree, remembering the
+    score of up to max_boards boards (the least recently used
+    is forgotten first).
+
+    >>> index = trie.build(boggler.read_dict("data/dict.txt"))
+    >>> scorer = Scorer(index)
+    >>> scorer.points(list("PLXXMEXXXAXXSXXX"))
+    16
+    >>> scorer.points(list("PLXXMEXXXAXXSXXX")), scorer.solved
+    (16, 1)
+    >>> scorer = Scorer(index, max_boards=1)
+    >>> [scorer.points(list(board)) for board in ("PLXXMEXXXAXXSXXX", "X" * 16)]
+    [16, 0]
+    >>> len(scorer.known), scorer.solved
+    (1, 2)
+    """
+
+    def __init__(self, index: dict, n_rows: int = config.N_ROWS, n_cols: int = config.N_COLS,
+                 max_boards: int = 100000):
+        self.index = index
+        self.n_rows = n_rows
+        self.n_cols = n_cols
+        self.max_boards = max_boards
+        # board string -> points, least recently used first
+        self.known = collections.OrderedDict()
+        self.solved = 0     # Boards actually solved (not remembered)
+
+    def points(self, letters: list[str]) -> int:
+        """Score of the board with letters, row by row"""
+        key = "".join(letters)
+        points = self.known.get(key)
+        if points is not None:
+            self.known.move_to_end(key)
+        else:
+            board = boggler.unpack_board(key, self.n_rows, self.n_cols)
+            points = boggler.score(boggler.boggle_solve(board, self.index,
+                                                        engine=boggler.ITERATIVE))
+            self.solved += 1
+            self.known[key] = points
+            if len(self.known) > self.max_boards:
+                self.known.popitem(last=False)
+        return points
+
+
+def distance(points: int, low: int, high: int) -> int:
+    """How far points is from the range low..high
+
+    >>> distance(120, 100, 150), distance(90, 100, 150), distance(160, 100, 150)
+    (0, 10, 10)
+    """
+    if points < low:
+        return low - points
+    if points > high:
+        return points - high
+    return 0
+
+
+def generate(scorer: Scorer, low: int, high: int,
+             rng: random.Random, max_steps: int = 20000) -> tuple[str, int, int]:
+    """Search for a board scoring between low and high points.
+    Returns (board string, points, candidates evaluated); the board
+    is the closest found if none in range turned up within max_steps.
+
+    >>> index = trie.build(boggler.read_dict("data/dict.txt"))
+    >>> board, points, steps = generate(Scorer(index), 60, 80, random.Random(210))
+    >>> 60 <= points <= 80
+    True
+    >>> points == boggler.score(boggler.boggle_solve(boggler.unpack_board(board), index))
+    True
+    >>> board, points, steps = generate(Scorer(index), 400, 500, random.Random(210), max_steps=5)
+    >>> points < 400, steps
+    (True, 5)
+    """
+    n_cells = scorer.n_rows * scorer.n_cols
+    letters = list(random_board(scorer.n_rows, scorer.n_cols, rng))
+    cost = distance(scorer.points(letters), low, high)
+    best = (cost, "".join(letters))
+    steps = 0
+    while cost > 0 and steps < max_steps:
+        steps += 1
+        # Cools toward zero but never reaches it, even on the last step
+        temperature = START_TEMPERATURE * (1 - (steps - 1) / max_steps)
+        if rng.random() < REPLACE_RATE:
+            cell_a = cell_b = rng.randrange(n_cells)
+            old_letter = letters[cell_a]
+            letters[cell_a] = rng.choices(list(LETTER_WEIGHTS),
+                                          weights=list(LETTER_WEIGHTS.values()))[0]
+        else:
+            cell_a, cell_b = rng.sample(range(n_cells), 2)
+            old_letter = letters[cell_a]
+            letters[cell_a], letters[cell_b] = letters[cell_b], letters[cell_a]
+        new_cost = distance(scorer.points(letters), low, high)
+        if (new_cost <= cost
+                or rng.random() < math.exp((cost - new_cost) / temperature)):
+            cost = new_cost
+            if cost < best[0]:
+                best = (cost, "".join(letters))
+        else:
+            # Undo the move; the old board's score is already known
+            letters[cell_a], letters[cell_b] = letters[cell_b], letters[cell_a]
+            letters[cell_a] = old_letter
+    board = best[1]
+    return board, scorer.points(list(board)), steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate Boggle boards in a score range")
+    parser.add_argument("--low", type=int, required=True, help="lowest acceptable score")
+    parser.add_argument("--high", type=int, required=True, help="highest acceptable score")
+    parser.add_argument("--count", type=int, default=1, help="number of boards (default 1)")
+    parser.add_argument("--seed", type=int, help="random seed, for repeatable output")
+    parser.add_argument("--steps", type=int, default=20000,
+                        help="most candidates to evaluate per board (default 20000)")
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    index = trie.build(boggler.read_dict(config.DICT_PATH))
+    scorer = Scorer(index)
+    for _ in range(args.count):
+        board, points, steps = generate(scorer, args.low, args.high, rng, args.steps)
+        print(board, points, steps)
+
+
+if __name__ == "__main__":
+    doctest.testmod()
+    print("Doctests complete")
+    main()
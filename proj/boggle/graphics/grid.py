@@ -54,13 +54,16 @@ class Grid:
     """Visual display of the grid"""
 
     def __init__(self, rows: int, cols: int, width_px: int = 500, height_px: int = 500,
-                 title: str = "Grid", cell_margin_px: int = 5) :
+                 title: str = "Grid", cell_margin_px: int = 5,
+                 autoflush: bool = True) :
         """Create and show the grid display, initially all white.
         rows, cols are the grid size in rows and columns.
         width, height are the window size in pixels.
+        With autoflush False, changes appear only when update()
+        is called (or the window is otherwise idle).
         """
         log.debug("Creating grid")
-        self.win = GraphWin("Grid", width_px, height_px)
+        self.win = GraphWin("Grid", width_px, height_px, autoflush=autoflush)
         self.bkgrnd = Rectangle( Point(0,0), Point(width_px,height_px) )
         self.bkgrnd.setFill( color_rgb(231,231,231) ) # Grey background
         self.cell_width = width_px / cols
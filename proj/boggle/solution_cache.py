@@ -0,0 +1,187 @@
+"""solution_cache.py
+Remember the solutions of boards already solved.
+
+Rotating or reflecting a Boggle board keeps every pair of adjacent
+cells adjacent, so it has exactly the same words.  The cache is keyed
+on a canonical form of the board: the smallest of its letter strings
+under the 8 symmetries of a square (4 for a rectangular board).  A
+board that is a rotation or reflection of one seen before is a hit.
+
+CS 210, Fall 2022
+by Alex JPS
+"""
+import collections
+import doctest
+import hashlib
+import json
+import os
+
+import boggler
+import config
+import trie
+
+
+def symmetries(letters: str, n_rows: int, n_cols: int) -> list[str]:
+    """The board strings for letters (n_rows x n_cols, row by row)
+    rotated and reflected every way that keeps its shape.
+
+    >>> sorted(symmetries("ABCD", 2, 2))
+    ['ABCD', 'ACBD', 'BADC', 'BDAC', 'CADB', 'CDAB', 'DBCA', 'DCBA']
+    >>> sorted(symmetries("ABCDEF", 2, 3))
+    ['ABCDEF', 'CBAFED', 'DEFABC', 'FEDCBA']
+    """
+    rows = [letters[i * n_cols:(i + 1) * n_cols] for i in range(n_rows)]
+    flips = [rows,                                    # as is
+             [row[::-1] for row in rows],             # mirror left-right
+             rows[::-1],                              # mirror top-bottom
+             [row[::-1] for row in rows[::-1]]]       # rotate 180
+    if n_rows == n_cols:
+        # Transposing, then flipping, gives the quarter turns and diagonals
+        transposed = ["".join(column) for column in zip(*rows)]
+        flips += [transposed,
+                  [row[::-1] for row in transposed],
+                  transposed[::-1],
+                  [row[::-1] for row in transposed[::-1]]]
+    return ["".join(flip) for flip in flips]
+
+
+def canonical(letters: str, n_rows: int, n_cols: int) -> str:
+    """Canonical form of a board: equal for boards that are
+    rotations or reflections of each other.
+
+    >>> canonical("ABCD", 2, 2) == canonical("CADB", 2, 2)
+    True
+    >>> canonical("ABCD", 2, 2) == canonical("ABDC", 2, 2)
+    False
+    """
+    return min(symmetries(letters, n_rows, n_cols))
+
+
+def fingerprint(words: list[str] | dict) -> str:
+    """Digest of the words in a word list or prefix tree: equal for
+    the same words however they are held, in whatever order.
+
+    >>> fingerprint(["AXE", "AXLE"]) == fingerprint(trie.build(["AXLE", "AXE"]))
+    True
+    >>> fingerprint(["AXE", "AXLE"]) == fingerprint(["AXE"])
+    False
+    """
+    listed = trie.words(words) if isinstance(words, dict) else sorted(words)
+    return hashlib.sha1("\n".join(listed).encode()).hexdigest()
+
+
+class SolutionCache:
+    """Least-recently-used cache of board solutions and scores,
+    holding at most maxsize boards.  If path is given, the cache is
+    loaded from that file (if present) and save() writes it back.
+    Solutions depend on the words solved with, so the cache holds
+    solutions for one set of words at a time (see fingerprint), and
+    the file records which; solving with other words empties it.
+
+    >>> words = boggler.read_dict("data/dict.txt")
+    >>> cache = SolutionCache(maxsize=2)
+    >>> cache.solve_and_score(boggler.unpack_board("PLXXMEXXXAXXSXXX"), words)[1]
+    16
+    >>> rotated = boggler.unpack_board("XXXSXXAXXXEMXXLP")
+    >>> cache.solve(rotated, words)[:3]
+    ['AMP', 'AMPLE', 'AXE']
+    >>> cache.hits, cache.misses
+    (1, 1)
+    >>> cache.solve(rotated, ["AXE", "AXLE"])
+    ['AXE', 'AXLE']
+    >>> cache.hits, cache.misses, len(cache.entries)
+    (1, 2, 1)
+    >>> cache.solve(rotated, ["AXLE", "AXE"])   # The same words again
+    ['AXE', 'AXLE']
+    >>> cache.hits, cache.misses
+    (2, 2)
+    """
+
+    def __init__(self, maxsize: int = config.SOLUTION_CACHE_SIZE,
+                 path: str | None = None):
+        self.maxsize = maxsize
+        self.path = path
+        # canonical key -> (solutions, points), least recently used first
+        self.entries = collections.OrderedDict()
+        self.words = None           # fingerprint of the words solved with
+        self.last_words = (None, None)  # Last words object and its fingerprint
+        self.hits = 0
+        self.misses = 0
+        if path is not None:
+            self.load()
+
+    @staticmethod
+    def key(board: list[list[str]]) -> str:
+        """Cache key for board: its shape and canonical letters"""
+        n_rows, n_cols = len(board), len(board[0])
+        letters = "".join("".join(row) for row in board)
+        return f"{n_rows}x{n_cols}:{canonical(letters, n_rows, n_cols)}"
+
+    def solve_and_score(self, board: list[list[str]], words: list[str] | dict,
+                        engine: str = boggler.RECURSIVE) -> tuple[list[str], int]:
+        """Solutions of board (as boggler.boggle_solve) and their score,
+        solving only if no equivalent board is cached.
+        """
+        # Fingerprinting a prefix tree takes longer than solving a board,
+        # so a words object used again is not fingerprinted again
+        last, words_print = self.last_words
+        if words is not last:
+            words_print = fingerprint(words)
+            self.last_words = (words, words_print)
+        if words_print != self.words:
+            self.entries.clear()        # Solved with other words
+            self.words = words_print
+        key = self.key(board)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        else:
+            self.misses += 1
+            solutions = boggler.boggle_solve(board, words, engine=engine)
+            entry = (solutions, boggler.score(solutions))
+            self.entries[key] = entry
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        solutions, points = entry
+        return list(solutions), points
+
+    def solve(self, board: list[list[str]], words: list[str] | dict,
+              engine: str = boggler.RECURSIVE) -> list[str]:
+        """Solutions of board, as boggler.boggle_solve, from the cache if possible"""
+        return self.solve_and_score(board, words, engine)[0]
+
+    def load(self):
+        """Replace the cache contents with those saved at self.path,
+        unless there is no such file.  The entries are kept only if
+        the next words solved with are those they were solved with.
+        """
+        try:
+            with open(self.path) as file:
+                saved = json.load(file)
+        except (OSError, ValueError):
+            return
+        self.words = saved.get("words")
+        self.entries = collections.OrderedDict(
+            (key, (solutions, points)) for key, solutions, points in saved["entries"])
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def save(self):
+        """Write the cache to self.path (replacing it all at once);
+        does nothing for a cache without a path.
+        """
+        if self.path is None:
+            return
+        temp = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp, "w") as file:
+            json.dump({"words": self.words,
+                       "entries": [[key, solutions, points]
+                                   for key, (solutions, points) in self.entries.items()]},
+                      file)
+        os.replace(temp, self.path)
+
+
+if __name__ == "__main__":
+    doctest.testmod()
+    print("Doctests complete")
@@ -0,0 +1,80 @@
+"""trie.py
+Prefix tree index over the Boggle dictionary.
+
+Each node is a dict mapping a letter to the child node for the
+prefix extended by that letter.  A node that completes a word
+also holds the whole word under the END key, so the solver can
+report it without rebuilding the string.
+
+CS 210, Fall 2022
+by Alex JPS
+"""
+import doctest
+import gc
+
+# Key for the complete word at a node (never a letter, so never a child)
+END = "$"
+
+
+def build(words: list[str]) -> dict:
+    """Build a prefix tree from a list of normalized words
+    (e.g., the result of boggler.read_dict).  Order does not matter.
+
+    >>> root = build(["BE", "BET", "AT"])
+    >>> sorted(root)
+    ['A', 'B']
+    >>> root["B"]["E"][END]
+    'BE'
+    >>> root["B"]["E"]["T"][END]
+    'BET'
+    >>> END in root["B"]
+    False
+    """
+    # Creating ~100k small dicts triggers repeated, fruitless garbage
+    # collection passes; pausing the collector halves the build time.
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _build(words)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _build(words: list[str]) -> dict:
+    """Body of build, run with the garbage collector paused"""
+    root = {}
+    for word in words:
+        node = root
+        for letter in word:
+            child = node.get(letter)
+            if child is None:
+                child = {}
+                node[letter] = child
+            node = child
+        node[END] = word
+    return root
+
+
+def words(root: dict) -> list[str]:
+    """All words held in the tree, in sorted order.
+
+    >>> words(build(["BET", "AT", "BE"]))
+    ['AT', 'BE', 'BET']
+    """
+    result = []
+    pending = [root]
+    while pending:
+        node = pending.pop()
+        for key, child in node.items():
+            if key == END:
+                result.append(child)
+            else:
+                pending.append(child)
+    result.sort()
+    return result
+
+
+if __name__ == "__main__":
+    doctest.testmod()
+    print("Doctests complete")
@@ -2,70 +2,312 @@
 2022-09-22  Michal Young for CS 210 at U Oregon
 CC-by-SA open source license
 
-This module creates and returns a grid represented as a list-of-lists.
+This module creates and returns a grid of cells, stored row by row
+in a single bytearray (one byte per cell) but indexable like a
+list-of-lists, cavern[row][col].
 It can also manage an associated cavern display.
 """
 import doctest
+import gzip
+import itertools
+import operator
+import time
 
 # Text symbols (single characters) for contents of grid
 AIR = " "
 STONE = "#"
 WATER = "~"
 
+# Commands that build walls, as read from a cave specification
+WALL_COMMANDS = {b"hwall", b"vwall"}
 
+# Bytes of cave specification read at a time
+CHUNK_SIZE = 1 << 20
 
-def read_cave(cavern_path: str) -> list[list[str]]:
+# The same symbols as stored in a Cave's cells
+AIR_BYTE = ord(AIR)
+STONE_BYTE = ord(STONE)
+WATER_BYTE = ord(WATER)
+
+
+class Cave:
+    """A grid of nrows x ncols cells, each AIR, STONE, or WATER.
+    cells holds the symbols row by row, one byte each, so
+    cells[row * ncols + col] is the byte for cavern[row][col].
+    Code that visits many cells should use cells (or index)
+    directly; cavern[row][col] is for convenience.
+
+    >>> cavern = Cave(2, 3)
+    >>> cavern[1][2] = STONE
+    >>> cavern[1][2], len(cavern), len(cavern[0])
+    ('#', 2, 3)
+    >>> cavern.cells
+    bytearray(b'     #')
+    """
+
+    def __init__(self, nrows: int, ncols: int, cells: bytearray | None = None):
+        self.nrows = nrows
+        self.ncols = ncols
+        if cells is None:
+            cells = bytearray(AIR.encode("ascii") * (nrows * ncols))
+        assert len(cells) == nrows * ncols, "cells should have nrows * ncols bytes"
+        self.cells = cells
+
+    def index(self, row: int, col: int) -> int:
+        """Position of cavern[row][col] in cells"""
+        return row * self.ncols + col
+
+    def hwall_cells(self, row: int, col: int, length: int) -> range:
+        """Positions in cells of a horizontal wall from (row, col),
+        length cells long; IndexError if it would leave the cave.
+
+        >>> Cave(3, 3).hwall_cells(1, 1, 2)
+        range(4, 6)
+        >>> Cave(3, 3).hwall_cells(0, 2, 3)
+        Traceback (most recent call last):
+        ...
+        IndexError: Wall from (0, 2), length 3, leaves the 3 x 3 cave
+        """
+        if not (0 <= row < self.nrows and col >= 0 and length >= 0
+                and col + length <= self.ncols):
+            raise IndexError(f"Wall from ({row}, {col}), length {length}, "
+                             f"leaves the {self.nrows} x {self.ncols} cave")
+        start = self.index(row, col)
+        return range(start, start + length)
+
+    def vwall_cells(self, row: int, col: int, length: int) -> range:
+        """Positions in cells of a vertical wall from (row, col),
+        length cells long; IndexError if it would leave the cave.
+
+        >>> Cave(3, 3).vwall_cells(1, 1, 2)
+        range(4, 10, 3)
+        """
+        if not (0 <= col < self.ncols and row >= 0 and length >= 0
+                and row + length <= self.nrows):
+            raise IndexError(f"Wall from ({row}, {col}), length {length}, "
+                             f"leaves the {self.nrows} x {self.ncols} cave")
+        start = self.index(row, col)
+        return range(start, start + length * self.ncols, self.ncols)
+
+    def __len__(self) -> int:
+        return self.nrows
+
+    def __getitem__(self, row: int) -> "CaveRow":
+        if not 0 <= row < self.nrows:
+            raise IndexError(f"Row {row} is outside the cave")
+        return CaveRow(self, row)
+
+    def __iter__(self):
+        for row in range(self.nrows):
+            yield CaveRow(self, row)
+
+    def rows(self) -> list[list[str]]:
+        """The cave as a list of lists of symbols"""
+        return [list(self.cells[row * self.ncols:(row + 1) * self.ncols].decode("ascii"))
+                for row in range(self.nrows)]
+
+    def copy(self) -> "Cave":
+        return Cave(self.nrows, self.ncols, bytearray(self.cells))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Cave):
+            return (self.nrows, self.ncols, self.cells) == (other.nrows, other.ncols, other.cells)
+        return self.rows() == other
+
+    def __repr__(self) -> str:
+        return repr(self.rows())
+
+
+class CaveRow:
+    """One row of a Cave, indexable by column (a view, not a copy)"""
+
+    def __init__(self, cavern: Cave, row: int):
+        self.cells = cavern.cells
+        self.ncols = cavern.ncols
+        self.start = row * cavern.ncols
+
+    def __len__(self) -> int:
+        return self.ncols
+
+    def _position(self, col: int) -> int:
+        if not 0 <= col < self.ncols:
+            raise IndexError(f"Column {col} is outside the cave")
+        return self.start + col
+
+    def __getitem__(self, col: int) -> str:
+        return chr(self.cells[self._position(col)])
+
+    def __setitem__(self, col: int, symbol: str):
+        self.cells[self._position(col)] = ord(symbol)
+
+    def __iter__(self):
+        return iter(self.cells[self.start:self.start + self.ncols].decode("ascii"))
+
+
+def open_spec(cavern_path: str):
+    """Open a cave specification for reading as bytes,
+    decompressing it as it is read if cavern_path ends with ".gz".
+    """
+    if cavern_path.endswith(".gz"):
+        return gzip.open(cavern_path, "rb")
+    return open(cavern_path, "rb")
+
+
+def read_cave(cavern_path: str, stats: dict | None = None) -> Cave:
     """Build and return a cavern (grid of character cells)
     from specification found at cavern_path, which should be
-    the path to a text file.   
-    
-    >>> read_cave("data/tiny_cave.txt")
-    [['#', '#', '#', '#'], ['#', ' ', ' ', '#'], ['#', ' ', ' ', '#'], ['#', '#', '#', '#']]
+    the path to a text file (gzip-compressed if it ends with ".gz").
+    The file is read CHUNK_SIZE bytes at a time, straight into the
+    cave's cells, so even specifications with millions of walls
+    need little memory beyond the cave itself.
+    If stats is a dict, it gets the "bytes" (uncompressed) and
+    "commands" read, and the "seconds" it took.
+
+    >>> read_cave("data/tiny-cave.txt")
+    [['#', '#', '#'], ['#', ' ', '#'], ['#', '#', '#']]
+    >>> stats = {}
+    >>> read_cave("data/cave.txt", stats) == read_cave("data/cave.txt")
+    True
+    >>> stats["commands"], stats["bytes"]
+    (9, 112)
     """
-    cave = []
-    cave_open = False
-    with open(cavern_path, 'r') as cavern_file:
-        for line in cavern_file:
-            fields = line.split()
-            command = fields[0]
-            if command == "cave":
-                assert len(fields) == 3, f"Syntax should be 'cave rows cols', got {line}"
-                nrows = int(fields[1])
-                ncols = int(fields[2])
-                assert nrows > 0, "Rows should be a positive integer: {line}"
-                assert ncols > 0, "Columns should be a positive integer: {line}"
-                cave = new_cave(nrows, ncols)
-                cave_open = True
-            elif command == "hwall":
-                assert cave_open, "First line should be 'cave rows cols'"
-                assert len(fields) == 4, "Syntax 'hwall startrow startcol length'"
-                assert cave_open, "cave command must precede hwall command"
-                start_row = int(fields[1])
-                start_col = int(fields[2])
-                length = int(fields[3])
-                assert start_row >= 0, "Start row must be integer, zero or greater"
-                assert start_col >= 0, "Start column must be integer, zero or greater"
-                assert length >= 1, "Length of wall must be integer, at least 1"
-                assert start_col + length <= ncols, "Wall cannot extend beyond right edge"
-                hwall(cave, start_row, start_col, length)
-            elif command == "vwall":
-                assert cave_open, "First line should be 'cave rows cols'"
-                assert len(fields) == 4, "Syntax 'vwall startrow startcol length'"
-                assert cave_open, "cave command must precede vwall command"
-                start_row = int(fields[1])
-                start_col = int(fields[2])
-                length = int(fields[3])
-                assert start_row >= 0, "Start row must be integer, zero or greater"
-                assert start_col >= 0, "Start column must be integer, zero or greater"
-                assert length >= 1, "Length of wall must be integer, at least 1"
-                assert start_row + length <= nrows, "Wall cannot extend through floor"
-                vwall(cave, start_row, start_col, length)
-            else:
-                print(f"**Command not understood: '{line}'")
+    start_time = time.perf_counter()
+    with open_spec(cavern_path) as spec:
+        line = spec.readline()
+        fields = line.split()
+        assert len(fields) == 3 and fields[0] == b"cave", \
+            f"First line should be 'cave rows cols', got {line.decode('ascii', 'replace')}"
+        nrows = int(fields[1])
+        ncols = int(fields[2])
+        assert nrows > 0, f"Rows should be a positive integer: {line}"
+        assert ncols > 0, f"Columns should be a positive integer: {line}"
+        cave = new_cave(nrows, ncols)
+        n_bytes = len(line)
+        commands = 1
+        while True:
+            chunk = spec.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            chunk += spec.readline()    # Finish the last line
+            n_bytes += len(chunk)
+            commands += build_walls(cave, chunk)
+    if stats is not None:
+        stats["bytes"] = n_bytes
+        stats["commands"] = commands
+        stats["seconds"] = time.perf_counter() - start_time
     return cave
 
 
-def new_cave(nrows: int, ncols: int):
+def build_walls(cave: Cave, chunk: bytes) -> int:
+    """Build the walls given by the hwall and vwall commands in chunk,
+    some whole lines of a cave specification.  Returns the number of
+    commands.  A chunk of nothing but well-formed wall commands is
+    converted, checked, and built a whole field at a time; anything
+    else is read line by line, for a precise error message.
+
+    >>> cave = new_cave(3, 3)
+    >>> build_walls(cave, b"hwall 0 0 3\\nvwall 0 1 3\\n")
+    2
+    >>> print(text(cave))
+    -----
+    |###|
+    | # |
+    | # |
+    -----
+    >>> build_walls(new_cave(5, 5), b"hwall 1 2\\n3 hwall 0 0 1\\n")
+    Traceback (most recent call last):
+    ...
+    AssertionError: Syntax 'hwall startrow startcol length'
+    """
+    tokens = chunk.split()
+    commands = tokens[0::4]
+    # Each line must start one command of exactly four fields
+    firsts = [fields[0] for fields in (line.split(None, 1) for line in chunk.splitlines())
+              if fields]
+    if (len(tokens) == 4 * len(firsts) and firsts == commands
+            and all(map(WALL_COMMANDS.__contains__, commands))):
+        try:
+            # Any token out of place, including a command, fails to convert
+            rows = list(map(int, tokens[1::4]))
+            cols = list(map(int, tokens[2::4]))
+            lengths = list(map(int, tokens[3::4]))
+        except ValueError:
+            rows = None
+        if rows is not None:
+            is_hwall = list(map(b"hwall".__eq__, commands))
+            is_vwall = list(map(operator.not_, is_hwall))
+            hwalls = [list(itertools.compress(field, is_hwall)) for field in (rows, cols, lengths)]
+            vwalls = [list(itertools.compress(field, is_vwall)) for field in (rows, cols, lengths)]
+            if (walls_fit(hwalls[0], hwalls[1], hwalls[2], cave.nrows, cave.ncols)
+                    and walls_fit(vwalls[1], vwalls[0], vwalls[2], cave.ncols, cave.nrows)):
+                cells = cave.cells
+                ncols = cave.ncols
+                stone = memoryview(STONE.encode("ascii") * max(cave.nrows, ncols))
+                for row, col, length in zip(*hwalls):
+                    start = row * ncols + col
+                    cells[start:start + length] = stone[:length]
+                for row, col, length in zip(*vwalls):
+                    start = row * ncols + col
+                    cells[start:start + length * ncols:ncols] = stone[:length]
+                return len(commands)
+    commands = 0
+    for line in chunk.splitlines():
+        if line.strip():
+            build_command(cave, line.decode("ascii", "replace"))
+            commands += 1
+    return commands
+
+
+def walls_fit(across: list[int], along: list[int], lengths: list[int],
+              n_across: int, n_along: int) -> bool:
+    """Do walls starting at across[i], along[i], and extending lengths[i]
+    cells along, all fit in a grid n_across x n_along?  (For hwalls,
+    across is the row and along the column; the other way for vwalls.)
+
+    >>> walls_fit([0, 2], [1, 0], [2, 3], 3, 3)
+    True
+    >>> walls_fit([0, 2], [1, 0], [3, 3], 3, 3)
+    False
+    """
+    return (not lengths
+            or (min(across) >= 0 and max(across) < n_across
+                and min(along) >= 0 and min(lengths) >= 1
+                and max(map(operator.add, along, lengths)) <= n_along))
+
+
+def build_command(cave: Cave, line: str):
+    """Build the wall given by one hwall or vwall command line"""
+    fields = line.split()
+    command = fields[0]
+    nrows = cave.nrows
+    ncols = cave.ncols
+    if command == "hwall":
+        assert len(fields) == 4, "Syntax 'hwall startrow startcol length'"
+        start_row = int(fields[1])
+        start_col = int(fields[2])
+        length = int(fields[3])
+        assert 0 <= start_row < nrows, "Start row must be integer, zero or greater, inside the cave"
+        assert start_col >= 0, "Start column must be integer, zero or greater"
+        assert length >= 1, "Length of wall must be integer, at least 1"
+        assert start_col + length <= ncols, "Wall cannot extend beyond right edge"
+        hwall(cave, start_row, start_col, length)
+    elif command == "vwall":
+        assert len(fields) == 4, "Syntax 'vwall startrow startcol length'"
+        start_row = int(fields[1])
+        start_col = int(fields[2])
+        length = int(fields[3])
+        assert start_row >= 0, "Start row must be integer, zero or greater"
+        assert 0 <= start_col < ncols, "Start column must be integer, zero or greater, inside the cave"
+        assert length >= 1, "Length of wall must be integer, at least 1"
+        assert start_row + length <= nrows, "Wall cannot extend through floor"
+        vwall(cave, start_row, start_col, length)
+    elif command == "cave":
+        assert False, f"Only the first line should be 'cave rows cols', got {line}"
+    else:
+        print(f"**Command not understood: '{line}'")
+
+
+def new_cave(nrows: int, ncols: int) -> Cave:
     """Create and return a new cave with
     nrows rows and ncols columns, initially filled
     entirely with air.
@@ -73,16 +315,10 @@ def new_cave(nrows: int, ncols: int):
     >>> new_cave(3, 4)
     [[' ', ' ', ' ', ' '], [' ', ' ', ' ', ' '], [' ', ' ', ' ', ' ']]
     """
-    cave = []
-    for row in range(nrows):
-        newRow = []
-        cave.append(newRow)
-        for col in range(ncols):
-            newRow.append(AIR)
-    return cave
+    return Cave(nrows, ncols)
 
 
-def hwall(cave: list[list[str]], row: int, col: int, length: int):
+def hwall(cave: Cave, row: int, col: int, length: int):
     """Build a horizontal wall of stone starting from (row,col) and
     extending length cells to the right.
 
@@ -90,12 +326,16 @@ def hwall(cave: list[list[str]], row: int, col: int, length: int):
     >>> hwall(cave, 1, 1, 2)
     >>> cave
     [[' ', ' ', ' '], [' ', '#', '#'], [' ', ' ', ' ']]
+    >>> hwall(cave, 3, 0, 2)
+    Traceback (most recent call last):
+    ...
+    IndexError: Wall from (3, 0), length 2, leaves the 3 x 3 cave
     """
-    for i in range(length):
-        cave[row][col + i] = STONE
+    wall = cave.hwall_cells(row, col, length)
+    cave.cells[wall.start:wall.stop] = STONE.encode("ascii") * length
 
 
-def vwall(cave: list[list[str]], row: int, col: int, length: int):
+def vwall(cave: Cave, row: int, col: int, length: int):
     """Build a vertical wall of stone starting from (row,col) and
     extending length cells down.
 
@@ -104,24 +344,37 @@ def vwall(cave: list[list[str]], row: int, col: int, length: int):
     >>> cave
     [[' ', ' ', ' '], [' ', '#', ' '], [' ', '#', ' ']]
     """
-    for i in range(length):
-        cave[row + i][col] = STONE
+    wall = cave.vwall_cells(row, col, length)
+    cave.cells[wall.start:wall.stop:wall.step] = STONE.encode("ascii") * length
 
-def text(cave: list[list[str]]) -> str:
-    """A textual version of the cave, for debugging
+def text(cave: Cave | list[list[str]]) -> str:
+    """A textual version of the cave (a Cave or a list of rows
+    of symbols), for debugging
 
     >>> print(text([[' ', '#'], ['#', ' ']]))
     ----
     | #|
     |# |
     ----
+    >>> cave = new_cave(2, 2)
+    >>> hwall(cave, 0, 1, 1)
+    >>> hwall(cave, 1, 0, 1)
+    >>> print(text(cave))
+    ----
+    | #|
+    |# |
+    ----
     """
     if len(cave) == 0:
         return "(apparent cave-in; no cave)"
-    top_bot_border = '-' * (len(cave[0]) + 2)
+    if not isinstance(cave, Cave):
+        cave = Cave(len(cave), len(cave[0]),
+                    bytearray("".join(map("".join, cave)).encode("ascii")))
+    top_bot_border = '-' * (cave.ncols + 2)
     txt_rows = [ top_bot_border ]
-    for row in cave:
-        txt_rows.append("|" + "".join(row) + "|")
+    for row in range(cave.nrows):
+        start = cave.index(row, 0)
+        txt_rows.append("|" + cave.cells[start:start + cave.ncols].decode("ascii") + "|")
     txt_rows.append(top_bot_border)
     return "\n".join(txt_rows)
 
@@ -1,8 +1,12 @@
 """A graphical display of a cave represented as a rectangular grid of characters"""
 import graphics.grid
-import graphics.grid as grid_view
+import graphics.raster
 
 import cave
+import config
+
+# One canvas Rectangle per cell (grid), or one image for the whole cave (raster)
+grid_view = graphics.raster if config.DISPLAY == "raster" else graphics.grid
 
 # Size of displayed grid;
 # n_rows == 0 is also interpreted as "there is no current display"
@@ -14,23 +18,37 @@ n_cols = 0
 # move from chamber to chamber
 current_water = graphics.grid.get_cur_color()
 
+# With config.FRAME_RATE, cells filled since the last frame, as
+# (row, col, color), and how many to draw in each frame
+pending = []
+cells_per_frame = 1
+
 
-def display(cavern: list[list[str]], width: int, height: int):
+def display(cavern: cave.Cave, width: int, height: int):
     """Create a graphical representation of cave using the grid.
     This graphical representation can be further manipulated
     (e.g., filling cave cells with water of various colors)
     with fill_cell.
     """
-    global n_rows, n_cols
-    n_rows = len(cavern)
-    n_cols = len(cavern[0])
-    grid_view.make(n_rows, n_cols, width, height)
-    for row in range(n_rows):
-        for col in range(n_cols):
-            if cavern[row][col] == cave.STONE:
-                grid_view.fill_cell(row, col, grid_view.black)
-            elif cavern[row][col] == cave.WATER:
-                grid_view.fill_cell(row, col, current_water)
+    global n_rows, n_cols, cells_per_frame
+    n_rows = cavern.nrows
+    n_cols = cavern.ncols
+    # Fill the whole cave in about config.FILL_SECONDS, whatever its size
+    cells_per_frame = max(1, n_rows * n_cols // (config.FRAME_RATE * config.FILL_SECONDS or 1))
+    grid_view.make(n_rows, n_cols, width, height, autoflush=not config.FRAME_RATE)
+    if grid_view is graphics.raster:
+        # One image, so all the cells can be colored at once
+        grid_view.fill_cells(cavern.cells, {cave.STONE_BYTE: grid_view.black,
+                                            cave.WATER_BYTE: current_water})
+        grid_view.update()
+        return
+    for position, cell in enumerate(cavern.cells):
+        row, col = divmod(position, n_cols)
+        if cell == cave.STONE_BYTE:
+            grid_view.fill_cell(row, col, grid_view.black)
+        elif cell == cave.WATER_BYTE:
+            grid_view.fill_cell(row, col, current_water)
+    grid_view.update()
     return
 
 
@@ -49,11 +67,29 @@ def fill_cell(row: int, col: int):
         return
     assert 0 <= row < n_rows, f"Row must be in range 0..{n_rows - 1} "
     assert 0 <= col < n_cols, f"Column must be in range 0..{n_cols - 1}"
-    grid_view.fill_cell(row, col, color=current_water)
+    if not config.FRAME_RATE:
+        grid_view.fill_cell(row, col, color=current_water)
+        return
+    pending.append((row, col, current_water))
+    if len(pending) >= cells_per_frame:
+        flush()
+
+
+def flush():
+    """Draw the cells filled since the last frame, waiting first
+    if need be so frames come at most config.FRAME_RATE per second.
+    """
+    if n_rows == 0 or not pending:
+        return
+    for row, col, color in pending:
+        grid_view.fill_cell(row, col, color)
+    pending.clear()
+    grid_view.update(config.FRAME_RATE)
 
 
 def prompt_to_close():
     """Prompt the user before closing the display"""
+    flush()
     input("Press enter to close display")
     grid_view.win.close()
     n_rows = 0
@@ -0,0 +1,228 @@
+"""chamber_map.py
+Keep the chamber count of a cave up to date as walls are added and
+removed, without rescanning the whole cave after each change.
+
+A ChamberMap labels the cave once (labeling.label_chambers), then
+keeps each cell's label, a union-find forest over labels, and the size
+of each chamber.  Turning stone into air joins the new cell to the
+chambers around it, a union per neighboring chamber.  Turning air into
+stone may split a chamber: searches start from each air cell beside
+the new stone and run in turns, one cell each.  Searches that meet are
+merged.  A search that runs out of cells before the others has found a
+separate chamber, and only its cells are relabeled.  So the work is
+proportional to the smaller pieces, not to the chamber or the cave.
+A cut into big pieces (SEARCH_LIMIT) relabels the whole cave instead.
+
+CS 210 project
+by Alex JPS
+"""
+import doctest
+from typing import Iterable
+
+import cave
+import labeling
+
+# A search for the pieces of a cut chamber gives up, and the whole cave
+# is relabeled, after reaching this fraction of the cells.  Relabeling
+# runs about this many times faster per cell than the search.
+SEARCH_LIMIT = 1 / 32
+
+
+class ChamberMap:
+    """Chambers of cavern, kept current through add_* and remove_*,
+    which change cavern as well.  Chambers are labeled
+    arbitrarily (see chamber), not in scan order.
+
+    >>> cavern = cave.read_cave("data/cave.txt")
+    >>> chambers = ChamberMap(cavern)
+    >>> chambers.chambers
+    3
+    >>> chambers.add_hwall(4, 1, 3)         # Cuts the big chamber in two
+    >>> chambers.chambers, chambers.size(2, 1), chambers.size(5, 1)
+    (4, 15, 12)
+    >>> chambers.remove_vwall(1, 6, 5)      # Opens two chambers into one
+    >>> chambers.chambers, chambers.size(2, 1), chambers.size(2, 8)
+    (3, 30, 30)
+    >>> chambers.remove_hwall(4, 1, 3)
+    >>> chambers.chambers, chambers.chambers == labeling.label_chambers(cavern)[0]
+    (2, True)
+    """
+
+    def __init__(self, cavern: cave.Cave):
+        self.cave = cavern
+        self.labels = None
+        self.relabel()
+
+    def relabel(self):
+        """Label the chambers from scratch"""
+        chambers, labels, sizes = labeling.label_chambers(self.cave, self.labels)
+        self.chambers = chambers
+        self.labels = labels                    # Label of each cell, 0 for stone
+        self.parent = list(range(chambers + 1)) # Union-find forest over labels
+        self.sizes = [0] + sizes                # Cells in chamber, by root label
+
+    def chamber(self, row: int, col: int) -> int:
+        """Label of the chamber containing cavern[row][col], or 0 for
+        stone.  Two cells are in the same chamber exactly when they
+        have the same label, but labels change as walls change.
+        """
+        label = self.labels[self.cave.index(row, col)]
+        return labeling.find(self.parent, label) if label else 0
+
+    def size(self, row: int, col: int) -> int:
+        """Number of cells in the chamber containing cavern[row][col]"""
+        return self.sizes[self.chamber(row, col)]
+
+    def add_hwall(self, row: int, col: int, length: int):
+        """As cave.hwall, keeping the chambers up to date"""
+        self.add_stone(self.cave.hwall_cells(row, col, length))
+
+    def add_vwall(self, row: int, col: int, length: int):
+        """As cave.vwall, keeping the chambers up to date"""
+        self.add_stone(self.cave.vwall_cells(row, col, length))
+
+    def remove_hwall(self, row: int, col: int, length: int):
+        """Turn the cells cave.hwall would make stone back to air"""
+        self.remove_stone(self.cave.hwall_cells(row, col, length))
+
+    def remove_vwall(self, row: int, col: int, length: int):
+        """Turn the cells cave.vwall would make stone back to air"""
+        self.remove_stone(self.cave.vwall_cells(row, col, length))
+
+    def _neighbors(self, position: int) -> list[int]:
+        """Positions of the cells above, below, left, and right of position"""
+        ncols = self.cave.ncols
+        result = []
+        if position >= ncols:
+            result.append(position - ncols)
+        if position + ncols < len(self.cave.cells):
+            result.append(position + ncols)
+        if position % ncols:
+            result.append(position - 1)
+        if (position + 1) % ncols:
+            result.append(position + 1)
+        return result
+
+    def _new_label(self, size: int) -> int:
+        label = len(self.parent)
+        self.parent.append(label)
+        self.sizes.append(size)
+        return label
+
+    def remove_stone(self, positions: Iterable[int]):
+        """Turn the stone cells at positions (in cells) to air,
+        joining the chambers each one opens into.
+        """
+        cells = self.cave.cells
+        labels = self.labels
+        parent = self.parent
+        sizes = self.sizes
+        for position in positions:
+            if cells[position] != cave.STONE_BYTE:
+                continue
+            cells[position] = cave.AIR_BYTE
+            roots = {labeling.find(parent, labels[neighbor])
+                     for neighbor in self._neighbors(position)
+                     if cells[neighbor] == cave.AIR_BYTE}
+            if not roots:
+                labels[position] = self._new_label(1)
+                self.chambers += 1
+                continue
+            # Smaller chambers join the largest
+            root = max(roots, key=sizes.__getitem__)
+            for other in roots:
+                if other != root:
+                    parent[other] = root
+                    sizes[root] += sizes[other]
+                    self.chambers -= 1
+            sizes[root] += 1
+            labels[position] = root
+
+    def add_stone(self, positions: Iterable[int]):
+        """Turn the air cells at positions (in cells) to stone,
+        splitting any chamber they cut in pieces.
+        """
+        cells = self.cave.cells
+        labels = self.labels
+        parent = self.parent
+        filled = []
+        for position in positions:
+            if cells[position] != cave.AIR_BYTE:
+                continue
+            root = labeling.find(parent, labels[position])
+            cells[position] = cave.STONE_BYTE
+            labels[position] = 0
+            self.sizes[root] -= 1
+            if self.sizes[root] == 0:
+                self.chambers -= 1
+            filled.append(position)
+        # Every piece of a cut chamber touches some of the new stone
+        edges = {}
+        for position in filled:
+            for neighbor in self._neighbors(position):
+                if cells[neighbor] == cave.AIR_BYTE:
+                    root = labeling.find(parent, labels[neighbor])
+                    edges.setdefault(root, {})[neighbor] = None
+        for root, seeds in edges.items():
+            if len(seeds) > 1 and not self._split(root, list(seeds)):
+                self.relabel()
+                return
+
+    def _split(self, root: int, seeds: list[int]) -> bool:
+        """Relabel all but one of the pieces that the air cells seeds,
+        all once in chamber root, now fall into.  Returns False,
+        leaving the labels inconsistent, if that takes too long.
+        """
+        cells = self.cave.cells
+        limit = SEARCH_LIMIT * len(cells)
+        group = list(range(len(seeds)))    # Union-find forest over searches
+        owner = {}                          # Search that reached each cell
+        found = [[seed] for seed in seeds]  # Cells reached, by root search
+        pending = [[seed] for seed in seeds]
+        for search, seed in enumerate(seeds):
+            owner[seed] = search
+        active = list(range(len(seeds)))
+        while len(active) > 1:
+            for search in list(active):
+                if len(active) == 1:
+                    break       # The rest keeps the old label
+                if search not in active:
+                    continue    # Merged this round
+                if not pending[search]:
+                    # A whole piece, apart from the other searches
+                    active.remove(search)
+                    piece = found[search]
+                    label = self._new_label(len(piece))
+                    for position in piece:
+                        self.labels[position] = label
+                    self.sizes[root] -= len(piece)
+                    self.chambers += 1
+                    continue
+                if len(owner) > limit:
+                    return False
+                position = pending[search].pop()
+                for neighbor in self._neighbors(position):
+                    if cells[neighbor] != cave.AIR_BYTE:
+                        continue
+                    other = owner.get(neighbor)
+                    if other is None:
+                        owner[neighbor] = search
+                        found[search].append(neighbor)
+                        pending[search].append(neighbor)
+                        continue
+                    other = labeling.find(group, other)
+                    if other != search:
+                        # The searches met: the larger takes over the smaller
+                        if len(found[other]) > len(found[search]):
+                            search, other = other, search
+                        group[other] = search
+                        found[search] += found[other]
+                        pending[search] += pending[other]
+                        found[other] = pending[other] = None
+                        active.remove(other)
+        return True
+
+
+if __name__ == "__main__":
+    doctest.testmod()
+    print("Doctests complete")
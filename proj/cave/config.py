@@ -0,0 +1,23 @@
+"""Configuration of flood-fill chamber counter"""
+
+# Cave specification to scan
+CAVE_PATH = "data/cave.txt"
+
+# Display window size, in pixels
+WIN_WIDTH = 500
+WIN_HEIGHT = 500
+
+# How scan_cave fills each chamber: "recursive" (one call per cell)
+# or "scanline" (whole runs of a row at a time, with an explicit stack);
+# or "label" to count chambers by labeling, without filling or display
+# ("vector" labels with numpy, and "tiled" on every core, for very large caves)
+FILL_ENGINE = "scanline"
+
+# Display: frames drawn per second while filling (0 to draw each cell
+# as it is filled), and about how long filling the whole cave should take
+FRAME_RATE = 30
+FILL_SECONDS = 10
+
+# Display: "raster" draws the cave as one image, for caves of any size;
+# "grid" draws one rectangle per cell
+DISPLAY = "raster"
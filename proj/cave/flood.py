@@ -7,11 +7,21 @@ by Alex JPS
 """
 
 import doctest
+
 import cave
+import labeling
+import tiled_labeling
 import config
 import cave_view
 
-def fill(cavern: list[list[str]], row_i: int, col_i: int):
+# Chamber fill engines for scan_cave
+RECURSIVE = "recursive"     # fill: recursive, one call per cell
+SCANLINE = "scanline"       # fill_scanline: runs of cells, explicit stack
+LABEL = "label"             # labeling.label_chambers: count only, no filling
+VECTOR = "vector"           # vector_labeling.label_chambers: the same with numpy
+TILED = "tiled"             # tiled_labeling.count_chambers: the same on all cores
+
+def fill(cavern: cave.Cave, row_i: int, col_i: int):
     """Fill the whole chamber around cavern[row_i][col_i] with water"""
     if (row_i in range(len(cavern))
         and col_i in range(len(cavern[0]))):
@@ -23,8 +33,57 @@ def fill(cavern: list[list[str]], row_i: int, col_i: int):
             fill(cavern, row_i, col_i - 1)
             fill(cavern, row_i, col_i + 1)
 
-def scan_cave(cavern: list[list[str]]) -> int:
+def fill_scanline(cavern: cave.Cave, row_i: int, col_i: int):
+    """Fill the whole chamber around cavern[row_i][col_i] with water,
+    a horizontal run of air at a time.  Pending runs are kept on an
+    explicit stack (one seed cell per run), so chamber size is not
+    limited by Python's recursion limit.
+
+    >>> cavern = cave.new_cave(3, 4)
+    >>> cave.vwall(cavern, 0, 1, 2)
+    >>> fill_scanline(cavern, 0, 0)
+    >>> print(cave.text(cavern))
+    ------
+    |~#~~|
+    |~#~~|
+    |~~~~|
+    ------
+    """
+    cells = cavern.cells
+    n_rows = cavern.nrows
+    n_cols = cavern.ncols
+    seeds = [cavern.index(row_i, col_i)]
+    while seeds:
+        seed = seeds.pop()
+        if cells[seed] != cave.AIR_BYTE:
+            continue    # Already filled from another seed
+        row_i = seed // n_cols
+        row_start = row_i * n_cols
+        row_end = row_start + n_cols
+        # Widen to the whole run of air containing the seed
+        left = max(cells.rfind(cave.STONE_BYTE, row_start, seed),
+                   cells.rfind(cave.WATER_BYTE, row_start, seed)) + 1
+        left = max(left, row_start)
+        right = labeling.AIR_RUN.match(cells, seed, row_end).end()
+        cells[left:right] = cave.WATER.encode("ascii") * (right - left)
+        for col in range(left - row_start, right - row_start):
+            cave_view.fill_cell(row_i, col)
+        # One seed for each run of air just above or below this run
+        for next_row_i in (row_i - 1, row_i + 1):
+            if 0 <= next_row_i < n_rows:
+                offset = (next_row_i - row_i) * n_cols
+                for run in labeling.AIR_RUN.finditer(cells, left + offset, right + offset):
+                    seeds.append(run.start())
+
+def scan_cave(cavern: cave.Cave, engine: str = config.FILL_ENGINE, labels=None) -> int:
     """Scan the cave for air pockets.  Return the number of air pockets encountered.
+    engine (RECURSIVE or SCANLINE) chooses how each chamber is filled.
+    With engine LABEL the chambers are counted by connected-component
+    labeling instead, and the cave is left as it was (no water, no display);
+    VECTOR does the same with numpy, and TILED on every core, for very
+    large caves.  LABEL and VECTOR write the chamber of each cell into
+    labels, if given: a buffer to reuse across scans, from
+    labeling.new_labels (LABEL) or an int32 numpy array (VECTOR).
 
     >>> cavern_1 = cave.read_cave("data/tiny-cave.txt")
     >>> scan_cave(cavern_1)
@@ -32,14 +91,42 @@ def scan_cave(cavern: list[list[str]]) -> int:
     >>> cavern_2 = cave.read_cave("data/cave.txt")
     >>> scan_cave(cavern_2)
     3
+    >>> scan_cave(cave.read_cave("data/twisty-cave.txt"), RECURSIVE)
+    7
+    >>> scan_cave(cave.read_cave("data/twisty-cave.txt"), SCANLINE)
+    7
+    >>> scan_cave(cave.read_cave("data/twisty-cave.txt"), LABEL)
+    7
+    >>> scan_cave(cave.read_cave("data/twisty-cave.txt"), TILED)
+    7
+    >>> labels = labeling.new_labels(cavern_2)
+    >>> scan_cave(cave.read_cave("data/cave.txt"), LABEL, labels), max(labels)
+    (3, 3)
     """
+    if engine == LABEL:
+        return labeling.label_chambers(cavern, labels)[0]
+    if engine == VECTOR:
+        import vector_labeling  # Only this engine needs numpy
+        return vector_labeling.label_chambers(cavern, labels)[0]
+    assert labels is None, "Only the LABEL and VECTOR engines fill in labels"
+    if engine == TILED:
+        return tiled_labeling.count_chambers(cavern)[0]
+    if engine == RECURSIVE:
+        fill_chamber = fill
+    elif engine == SCANLINE:
+        fill_chamber = fill_scanline
+    else:
+        raise ValueError(f"Unknown fill engine '{engine}'")
     chambers = 0
-    for row_i in range(len(cavern)):
-        for col_i in range(len(cavern[0])):
-            if cavern[row_i][col_i] == cave.AIR:
-                fill(cavern, row_i, col_i)
-                cave_view.change_water()
-                chambers += 1
+    # Filling a chamber only turns air to water, so
+    # the next unfilled chamber is at the next air cell
+    position = cavern.cells.find(cave.AIR_BYTE)
+    while position >= 0:
+        row_i, col_i = divmod(position, cavern.ncols)
+        fill_chamber(cavern, row_i, col_i)
+        cave_view.change_water()
+        chambers += 1
+        position = cavern.cells.find(cave.AIR_BYTE, position + 1)
     return chambers
 
 def main():
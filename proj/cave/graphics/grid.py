@@ -42,7 +42,7 @@ blue = color_rgb(0,0,200)
 global nrows
 nrows = 1
 
-def make( rows, cols, width, height ) :
+def make( rows, cols, width, height, autoflush=True ) :
     """Create the grid display, initially all white.
     rows, cols are the grid size in rows and columns.
     width, height are the window size in pixels.
@@ -52,10 +52,12 @@ def make( rows, cols, width, height ) :
         cols:  number of columns of cells in the grid (horizontal divisions)
         width:  horizontal width of window in pixels
         height: vertical height of window in pixels
+        autoflush: redraw after every change; if False, changes
+           appear only when update() is called
     Returns:  nothing
     """
     global win, cell_width, cell_height, nrows
-    win = GraphWin("Grid", width, height )
+    win = GraphWin("Grid", width, height, autoflush )
     win.setCoords(0, 0, cols, rows)
     bkgrnd = Rectangle( Point(0,0), Point(width,height) )
     bkgrnd.setFill( color_rgb(255,255,255) ) # White background
@@ -0,0 +1,131 @@
+"""
+Raster grid display.
+
+The same functions as grid (make, fill_cell, update, close), but the
+grid is drawn as a single image, one pixel (or square of pixels) per
+cell, instead of one canvas Rectangle per cell.  Tk slows to a crawl
+with hundreds of thousands of canvas items; an image of a 2000x2000
+grid is still quick to draw.
+
+The color of every cell is kept in a bytearray, as an index into a
+palette of the colors used so far (at most 256).  fill_cell only
+records the color and marks the row dirty; update rewrites the dirty
+rows of the image with PhotoImage.put, consecutive rows in one call.  A grid smaller than
+the window is scaled up by a whole number of pixels per cell; a larger
+one is scaled down by showing every step-th row and column.
+"""
+
+from graphics.graphics import *    # Zelle's simple OO graphics
+import graphics.graphics
+from graphics.grid import color_wheel, get_cur_color, get_next_color, \
+    black, white, red, green, blue
+
+global win  # The window we are drawing the grid in
+
+def make( rows, cols, width, height, autoflush=True ) :
+    """Create the grid display, initially all white.
+
+    Args:
+        rows:  number of rows of cells in the grid (vertical divisions)
+        cols:  number of columns of cells in the grid (horizontal divisions)
+        width:  horizontal width of window in pixels
+        height: vertical height of window in pixels
+        autoflush: redraw after every change; if False, changes
+           appear only when update() is called
+    Returns:  nothing
+    """
+    global win, image, nrows, ncols, zoom, step, palette, pixel_data, colors, dirty
+    win = GraphWin("Grid", width, height, autoflush)
+    nrows = rows
+    ncols = cols
+    zoom = max(1, min(width // cols, height // rows))
+    step = max(1, -(-cols // width), -(-rows // height))
+    image = Image(Point(width / 2, height / 2),
+                  zoom * len(range(0, cols, step)), zoom * len(range(0, rows, step)))
+    palette = {}        # Index of each color used
+    pixel_data = []     # Tk image data for a cell's pixels in a line, by index
+    _color_index(white)
+    colors = bytearray(rows * cols)
+    dirty = set(range(0, rows, step))
+    image.draw(win)
+    if autoflush:
+        update()
+
+def _color_index(color):
+    """Index of color in the palette, adding it if need be"""
+    color_i = palette.get(color)
+    if color_i is None:
+        assert len(palette) < 256, "Too many colors for a raster grid"
+        color_i = len(palette)
+        palette[color] = color_i
+        pixel_data.append(" ".join([color] * zoom))
+    return color_i
+
+def fill_cell(row, col, color):
+    """Fill cell[row,col] with color.
+
+    Args:
+        row:  which row the selected cell is in, 0 at the top
+        col:  which column the selected cell is in, 0 at the left
+        color: What color to fill the selected cell with.  Valid colors
+           include raster.white, raster.black, and values returned by
+           raster.get_next_color() and raster.get_cur_color()
+    """
+    global colors, dirty
+    colors[row * ncols + col] = _color_index(color)
+    if row % step == 0 and col % step == 0:
+        dirty.add(row)
+        if win.autoflush:
+            update()
+
+def fill_cells(symbols, color_of):
+    """Fill every cell at once from a grid of symbols.
+
+    Args:
+        symbols:  one byte per cell, row by row (like cave.Cave.cells)
+        color_of:  dict from a symbol byte to its color; cells with
+           other symbols are white
+    Returns: nothing
+    """
+    global colors, dirty
+    table = bytearray(256)      # Palette index of each symbol; white is 0
+    for symbol, color in color_of.items():
+        table[symbol] = _color_index(color)
+    colors[:] = symbols.translate(table)
+    dirty = set(range(0, nrows, step))
+    if win.autoflush:
+        update()
+
+def row_pixels(row):
+    """Tk image data for the line(s) of pixels showing row"""
+    start = row * ncols
+    pixels = " ".join(map(pixel_data.__getitem__, colors[start:start + ncols:step]))
+    return " ".join(["{" + pixels + "}"] * zoom)
+
+def update(rate=None):
+    """Redraw the rows changed since the last update, then let Tk
+    show them (at most rate times per second, if rate is given).
+    """
+    global dirty
+    rows = sorted(dirty)
+    dirty = set()
+    i = 0
+    while i < len(rows):
+        # A block of consecutive shown rows goes in one put
+        j = i + 1
+        while j < len(rows) and rows[j] == rows[j - 1] + step:
+            j += 1
+        data = " ".join(row_pixels(row) for row in rows[i:j])
+        image.img.put(data, to=(0, zoom * (rows[i] // step)))
+        i = j
+    graphics.graphics.update(rate)
+
+def close() :
+    """ Close the graphics window (shut down graphics).
+
+    Args: none
+    Returns: nothing
+    Effect:  the grid graphics window is closed.
+    """
+    global win
+    win.close()
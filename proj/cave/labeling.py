@@ -0,0 +1,145 @@
+"""labeling.py
+Count and measure the chambers of a cave by connected-component
+labeling, without filling it.
+
+Two passes over the cave.  The first goes row by row, finding each
+horizontal run of air and giving it a provisional label; a run that
+touches runs in the row above is merged with them in a union-find
+forest (with path compression).  Only the previous row's runs are
+needed at any time.  The second pass gives each chamber a final label
+1, 2, ... and writes it into a per-cell label array (0 for stone).
+
+CS 210 project
+by Alex JPS
+"""
+import array
+import doctest
+import re
+
+import cave
+
+# Runs of air in Cave.cells
+AIR_RUN = re.compile(re.escape(cave.AIR.encode("ascii")) + b"+")
+
+
+def find(parent: list[int], label: int) -> int:
+    """Root of label in the union-find forest parent, halving the path
+    to the root as we go so later finds are quicker.
+    """
+    while parent[label] != label:
+        parent[label] = parent[parent[label]]
+        label = parent[label]
+    return label
+
+
+def join_rows(parent: list[int], above: list[tuple], below: list[tuple]):
+    """Merge the label of each run of air in below with the labels of
+    the runs in above (the row before) that share a column with it.
+    Runs are (start, end, label), in order of start.  The older
+    (smaller) label is kept as root, so roots follow scan order.
+    """
+    i_above = 0
+    for start, end, label in below:
+        # Skip runs above that end before this one starts
+        while i_above < len(above) and above[i_above][1] <= start:
+            i_above += 1
+        i = i_above
+        while i < len(above) and above[i][0] < end:
+            root_above = find(parent, above[i][2])
+            root = find(parent, label)
+            if root_above < root:
+                parent[root] = root_above
+            elif root < root_above:
+                parent[root_above] = root
+            i += 1
+
+
+def label_runs(cells, n_cols: int, first_row: int, stop_row: int
+               ) -> tuple[list[int], list[list[tuple]]]:
+    """First pass of label_chambers over rows first_row..stop_row-1 of
+    the cells of a cave n_cols wide (Cave.cells, or any buffer like it).
+    Returns (parent, row_runs): the union-find forest over provisional
+    labels (0 is stone), and for each row its runs of air as
+    (start column, end column, provisional label).
+    """
+    parent = [0]
+    row_runs = []
+    above = []
+    for row_start in range(first_row * n_cols, stop_row * n_cols, n_cols):
+        runs = []
+        for match in AIR_RUN.finditer(cells, row_start, row_start + n_cols):
+            label = len(parent)
+            parent.append(label)
+            runs.append((match.start() - row_start, match.end() - row_start, label))
+        join_rows(parent, above, runs)
+        row_runs.append(runs)
+        above = runs
+    return parent, row_runs
+
+
+def new_labels(cavern: cave.Cave) -> array.array:
+    """A label buffer for label_chambers, one int per cell of cavern"""
+    return array.array("i", bytes(4 * cavern.nrows * cavern.ncols))
+
+
+def label_chambers(cavern: cave.Cave, labels: array.array | None = None
+                   ) -> tuple[int, array.array, list[int]]:
+    """Returns (chambers, labels, sizes) for the cave: the number of
+    chambers; an array of n_rows * n_cols chamber labels, row by row
+    (labels[row * n_cols + col] is 1..chambers, or 0 for stone); and
+    the number of cells in each chamber (sizes[label - 1]).
+    Chambers are labeled in the order scan_cave finds them.
+    The cave is not changed.  To analyze a cave (or caves of the same
+    size) many times, pass the same labels buffer (from new_labels)
+    each time; it is overwritten rather than allocated again.
+
+    >>> cavern = cave.read_cave("data/cave.txt")
+    >>> chambers, labels, sizes = label_chambers(cavern)
+    >>> chambers, sizes
+    (3, [30, 10, 8])
+    >>> list(labels[10:20])
+    [0, 1, 1, 1, 0, 1, 0, 2, 2, 0]
+    >>> cave.WATER in cave.text(cavern)
+    False
+    >>> cave.hwall(cavern, 1, 1, 3)
+    >>> label_chambers(cavern, labels)[0], list(labels[10:20])
+    (3, [0, 0, 0, 0, 0, 1, 0, 2, 2, 0])
+    """
+    n_rows = cavern.nrows
+    n_cols = cavern.ncols
+    parent, row_runs = label_runs(cavern.cells, n_cols, 0, n_rows)
+
+    # Second pass: final labels in order of first appearance
+    if labels is None:
+        labels = new_labels(cavern)
+        stone = None    # Already zero
+    else:
+        assert len(labels) == n_rows * n_cols, "labels should have a label for each cell"
+        stone = memoryview(array.array("i", bytes(4 * n_cols)))
+        view = memoryview(labels)
+    final = {}
+    sizes = []
+    for row_i, runs in enumerate(row_runs):
+        row_start = row_i * n_cols
+        if stone is not None:
+            # Zero the stone between runs, left from an earlier use
+            col = 0
+            for start, end, _ in runs:
+                view[row_start + col:row_start + start] = stone[:start - col]
+                col = end
+            view[row_start + col:row_start + n_cols] = stone[:n_cols - col]
+        for start, end, label in runs:
+            root = find(parent, label)
+            chamber = final.get(root)
+            if chamber is None:
+                sizes.append(0)
+                chamber = len(sizes)
+                final[root] = chamber
+            labels[row_start + start:row_start + end] = array.array("i", [chamber]) * (end - start)
+            sizes[chamber - 1] += end - start
+    return len(sizes), labels, sizes
+
+
+if __name__ == "__main__":
+    doctest.testmod()
+    print("Doctests complete")
@@ -0,0 +1,131 @@
+"""tiled_labeling.py
+Count and measure the chambers of a very large cave on several cores.
+
+The cave is cut into horizontal tiles of whole rows.  Each worker
+process labels its tiles with labeling.label_runs, reading the cells
+from one shared memory block (the cave is copied there once; tiles
+are passed to workers as row numbers, not pickled cells).  A tile
+comes back as the size of each of its chambers plus the runs of its
+first and last rows, labeled by chamber.  Chambers that cross a tile
+border are then merged with labeling.join_rows in a union-find over
+all the tiles' chambers.  Keeping the smallest label as each root
+numbers the chambers in scan order, so the count and sizes are
+exactly those of labeling.label_chambers.
+
+CS 210 project
+by Alex JPS
+"""
+import doctest
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+
+import cave
+import labeling
+
+# Tiles per worker, so a slow tile does not hold up the rest
+TILES_PER_WORKER = 4
+
+# The worker's view of the cave, set by _attach
+_tile_memory = None
+_tile_cells = None
+_tile_ncols = 0
+
+
+def _attach(name: str, ncols: int):
+    """Pool initializer: open the shared cells of the cave"""
+    global _tile_memory, _tile_cells, _tile_ncols
+    _tile_memory = shared_memory.SharedMemory(name)
+    _tile_cells = _tile_memory.buf
+    _tile_ncols = ncols
+
+
+def _label_tile(rows: tuple[int, int]) -> tuple[list[int], list[tuple], list[tuple]]:
+    """Label rows first_row..stop_row-1 of the worker's cave.  Returns
+    (sizes, top, bottom): the cells in each chamber of the tile
+    (sizes[label - 1], labels in scan order), and the runs of the
+    tile's first and last rows as (start, end, label).
+    """
+    first_row, stop_row = rows
+    parent, row_runs = labeling.label_runs(_tile_cells, _tile_ncols, first_row, stop_row)
+    final = {}
+    sizes = []
+    for runs in row_runs:
+        for start, end, label in runs:
+            root = labeling.find(parent, label)
+            chamber = final.get(root)
+            if chamber is None:
+                sizes.append(0)
+                chamber = len(sizes)
+                final[root] = chamber
+            sizes[chamber - 1] += end - start
+    top = [(start, end, final[labeling.find(parent, label)])
+           for start, end, label in row_runs[0]]
+    bottom = [(start, end, final[labeling.find(parent, label)])
+              for start, end, label in row_runs[-1]]
+    return sizes, top, bottom
+
+
+def count_chambers(cavern: cave.Cave, workers: int | None = None,
+                   tile_rows: int | None = None) -> tuple[int, list[int]]:
+    """Returns (chambers, sizes) for the cave, as labeling.label_chambers
+    does but without the labels, using workers processes (default: one
+    per core) on tiles of tile_rows rows (default: TILES_PER_WORKER
+    tiles per worker).  The cave is not changed.
+
+    >>> count_chambers(cave.read_cave("data/cave.txt"), workers=2, tile_rows=3)
+    (3, [30, 10, 8])
+    >>> twisty = cave.read_cave("data/twisty-cave.txt")
+    >>> count_chambers(twisty, workers=1, tile_rows=1) == count_chambers(twisty)
+    True
+    """
+    global _tile_cells, _tile_ncols
+    if workers is None:
+        workers = os.cpu_count() or 1
+    n_rows = cavern.nrows
+    if tile_rows is None:
+        tile_rows = -(-n_rows // (workers * TILES_PER_WORKER))
+    tiles = [(first_row, min(first_row + tile_rows, n_rows))
+             for first_row in range(0, n_rows, tile_rows)]
+    if workers <= 1 or len(tiles) == 1:
+        _tile_cells = cavern.cells
+        _tile_ncols = cavern.ncols
+        try:
+            results = list(map(_label_tile, tiles))
+        finally:
+            # Don't keep the caller's cave alive after we return
+            _tile_cells = None
+            _tile_ncols = 0
+    else:
+        memory = shared_memory.SharedMemory(create=True, size=len(cavern.cells))
+        try:
+            memory.buf[:len(cavern.cells)] = cavern.cells
+            with multiprocessing.Pool(min(workers, len(tiles)), _attach,
+                                      (memory.name, cavern.ncols)) as pool:
+                results = pool.map(_label_tile, tiles)
+        finally:
+            memory.close()
+            memory.unlink()
+
+    # Give each tile's chambers labels of their own, in scan order
+    parent = [0]
+    tile_sizes = [0]
+    above = []
+    for sizes, top, bottom in results:
+        offset = len(parent) - 1
+        parent.extend(range(offset + 1, offset + 1 + len(sizes)))
+        tile_sizes.extend(sizes)
+        top = [(start, end, offset + label) for start, end, label in top]
+        labeling.join_rows(parent, above, top)
+        above = [(start, end, offset + label) for start, end, label in bottom]
+    # Roots are the first label of each chamber, so come in scan order
+    chamber_sizes = {}
+    for label in range(1, len(parent)):
+        root = labeling.find(parent, label)
+        chamber_sizes[root] = chamber_sizes.get(root, 0) + tile_sizes[label]
+    return len(chamber_sizes), list(chamber_sizes.values())
+
+
+if __name__ == "__main__":
+    doctest.testmod()
+    print("Doctests complete")
@@ -0,0 +1,127 @@
+"""vector_labeling.py
+Count and measure the chambers of a cave with NumPy, for caves too
+big for a Python loop over cells or runs.
+
+The same plan as labeling.py, but each step works on whole arrays.
+Every horizontal run of air gets a number, in scan order.  Runs in
+consecutive rows that share a column are joined by an edge.  Chambers
+are the connected components of that graph, found by repeatedly
+hooking each component onto the smallest run number it touches and
+then jumping pointers until every run points at its root.  The root
+of a chamber is its first run in scan order, so chambers come out
+numbered in the same order as labeling.label_chambers and scan_cave.
+
+Needs numpy, which the rest of the cave project does not; flood.py
+imports this module only when its "vector" engine is chosen.
+
+    python vector_labeling.py [CAVE_FILE]
+
+CS 210 project
+by Alex JPS
+"""
+import doctest
+import sys
+import time
+
+import numpy as np
+
+import cave
+import config
+import labeling
+
+
+def air_runs(cavern: cave.Cave) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(run_of, starts, lengths): for each cell the number of the run
+    of air containing it (1, 2, ... in scan order, 0 for stone and
+    water), and the flat position and length of each run.
+
+    >>> run_of, starts, lengths = air_runs(cave.read_cave("data/tiny-cave.txt"))
+    >>> run_of.tolist(), starts.tolist(), lengths.tolist()
+    ([0, 0, 0, 0, 1, 0, 0, 0, 0], [4], [1])
+    """
+    air = np.frombuffer(cavern.cells, dtype=np.uint8) == cave.AIR_BYTE
+    # A run begins at air whose left neighbor is not air (or is in the row
+    # before) and ends at air whose right neighbor is not air (or is in the
+    # next row)
+    begins = air.copy()
+    begins[1:] &= ~air[:-1]
+    begins[::cavern.ncols] = air[::cavern.ncols]
+    ends = air.copy()
+    ends[:-1] &= ~air[1:]
+    ends[cavern.ncols - 1::cavern.ncols] = air[cavern.ncols - 1::cavern.ncols]
+    run_of = np.cumsum(begins, dtype=np.int32)
+    run_of *= air
+    starts = np.flatnonzero(begins)
+    lengths = np.flatnonzero(ends) + 1 - starts
+    return run_of, starts, lengths
+
+
+def components(n_nodes: int, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Root of each node 0..n_nodes-1 in the graph with edges a[i]--b[i];
+    the root of a component is its smallest node.
+
+    >>> components(5, np.array([3, 1]), np.array([4, 3])).tolist()
+    [0, 1, 2, 1, 1]
+    """
+    parent = np.arange(n_nodes)
+    while True:
+        # Jump pointers until each node points straight at its root
+        grandparent = parent[parent]
+        while not np.array_equal(grandparent, parent):
+            parent = grandparent
+            grandparent = parent[parent]
+        root_a = parent[a]
+        root_b = parent[b]
+        joined = root_a != root_b
+        if not joined.any():
+            return parent
+        # Hook the larger root of each edge under the smaller
+        low = np.minimum(root_a[joined], root_b[joined])
+        high = np.maximum(root_a[joined], root_b[joined])
+        np.minimum.at(parent, high, low)
+
+
+def label_chambers(cavern: cave.Cave, labels: np.ndarray | None = None
+                   ) -> tuple[int, np.ndarray, list[int]]:
+    """Returns (chambers, labels, sizes) as labeling.label_chambers
+    does, except that labels is a NumPy array.  The cave is not changed.
+    If labels is given (an int32 array, one per cell), the labels are
+    written into it instead of a new array.
+
+    >>> chambers, labels, sizes = label_chambers(cave.read_cave("data/cave.txt"))
+    >>> chambers, sizes
+    (3, [30, 10, 8])
+    >>> labels[10:20].tolist()
+    [0, 1, 1, 1, 0, 1, 0, 2, 2, 0]
+    >>> label_chambers(cave.read_cave("data/cave.txt"), labels)[1] is labels
+    True
+    """
+    n_cols = cavern.ncols
+    run_of, starts, lengths = air_runs(cavern)
+    # Runs touch where air lies directly above air
+    above = run_of[:-n_cols]
+    below = run_of[n_cols:]
+    touching = (above > 0) & (below > 0)
+    root = components(len(starts) + 1, above[touching], below[touching])
+    # Number chambers 1, 2, ... by root; 0 (not air) stays 0
+    roots, chamber_of_run = np.unique(root, return_inverse=True)
+    labels = np.take(chamber_of_run.astype(np.int32), run_of, out=labels)
+    sizes = np.bincount(chamber_of_run, weights=np.concatenate(([0], lengths)))[1:]
+    return len(roots) - 1, labels, sizes.astype(np.int64).tolist()
+
+
+def main():
+    doctest.testmod()
+    cave_path = sys.argv[1] if len(sys.argv) > 1 else config.CAVE_PATH
+    cavern = cave.read_cave(cave_path)
+    print(f"{cave_path}: {cavern.nrows} x {cavern.ncols}")
+    for name, label in (("labeling", labeling.label_chambers),
+                        ("vector_labeling", label_chambers)):
+        start = time.perf_counter()
+        chambers = label(cavern)[0]
+        elapsed = time.perf_counter() - start
+        print(f"  {name:<16}{chambers:>10} chambers{1000 * elapsed:>12.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+disk_index.py
+Compact on-disk anagram index that is searched in place through mmap,
+so that many short-lived processes can share one copy in the page cache
+instead of each loading the dictionary into Python objects.
+
+File layout (all integers little-endian):
+	header:   MAGIC, version, number of signatures n,
+	          source dictionary mtime (ns) and size
+	offsets:  n + 1 unsigned 32-bit offsets into the records
+	records:  for each signature in sorted order,
+	          b"signature\\tword word ...\\n"
+
+2022-09-27 by Alex JPS
+"""
+import mmap
+import os
+import struct
+
+MAGIC = b"UNJUMBLE"
+VERSION = 1
+HEADER = struct.Struct("<8sIIqq")
+OFFSET = struct.Struct("<I")
+
+def index_path(dict_name: str) -> str:
+	# Returns where the on-disk index for dictionary dict_name lives
+	return dict_name + ".anagrams"
+
+def _source_stamp(dict_name: str) -> tuple[int, int]:
+	# Returns (mtime in ns, size) of the dictionary, to detect changes
+	stat = os.stat(dict_name)
+	return stat.st_mtime_ns, stat.st_size
+
+def write(dict_name: str, index: dict[str, list[str]]):
+	# Writes index (signature -> words, e.g. from unjumble.load_index)
+	# for dictionary dict_name, replacing any previous file in one step
+	records = []
+	offsets = [0]
+	for sig in sorted(index):
+		record = (sig + "\t" + " ".join(index[sig]) + "\n").encode("utf-8")
+		records.append(record)
+		offsets.append(offsets[-1] + len(record))
+	mtime, size = _source_stamp(dict_name)
+	target = index_path(dict_name)
+	temp = f"{target}.{os.getpid()}.tmp"
+	with open(temp, "wb") as index_file:
+		index_file.write(HEADER.pack(MAGIC, VERSION, len(records), mtime, size))
+		index_file.write(b"".join(OFFSET.pack(offset) for offset in offsets))
+		index_file.write(b"".join(records))
+	os.replace(temp, target)
+
+class DiskIndex:
+	"""
+	Memory-mapped view of the on-disk index for a dictionary
+
+	>>> import unjumble
+	>>> write("shortdict.txt", unjumble.load_index("shortdict.txt"))
+	>>> index = DiskIndex("shortdict.txt")
+	>>> index.lookup("aahlp")
+	['alpha']
+	>>> index.lookup("zzz")
+	[]
+	>>> len(index)
+	5
+	"""
+
+	def __init__(self, dict_name: str):
+		# Opens the index for dict_name; raises ValueError
+		# if it is missing pieces or was built from another version of the dictionary
+		with open(index_path(dict_name), "rb") as index_file:
+			self.map = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+		if len(self.map) < HEADER.size:
+			raise ValueError(f"Truncated anagram index for {dict_name}")
+		magic, version, self.count, mtime, size = HEADER.unpack_from(self.map, 0)
+		if (magic, version) != (MAGIC, VERSION):
+			raise ValueError(f"Not a version {VERSION} anagram index: {index_path(dict_name)}")
+		if (mtime, size) != _source_stamp(dict_name):
+			raise ValueError(f"Anagram index is older than {dict_name}")
+		self.records_start = HEADER.size + OFFSET.size * (self.count + 1)
+
+	def __len__(self) -> int:
+		return self.count
+
+	def _record(self, i: int) -> tuple[int, int]:
+		# Returns (start, end) of record i in the map
+		start, = OFFSET.unpack_from(self.map, HEADER.size + OFFSET.size * i)
+		end, = OFFSET.unpack_from(self.map, HEADER.size + OFFSET.size * (i + 1))
+		return self.records_start + start, self.records_start + end
+
+	def lookup(self, sig: str) -> list[str]:
+		# Returns the words with signature sig, by binary search of the records
+		key = sig.encode("utf-8")
+		low = 0
+		high = self.count - 1
+		while high >= low:
+			mid = (high + low) // 2
+			start, end = self._record(mid)
+			tab = self.map.find(b"\t", start, end)
+			mid_key = self.map[start:tab]
+			if key == mid_key:
+				return self.map[tab + 1:end - 1].decode("utf-8").split()
+			elif key > mid_key:
+				low = mid + 1
+			else:
+				high = mid - 1
+		return []
+
+	def close(self):
+		self.map.close()
@@ -4,11 +4,25 @@ Find solutions to an anagram puzzle given a dictionary of valid words
 
 2022-09-27 by Alex JPS
 """
+import argparse
+import itertools
+import multiprocessing
+import sys
+from collections import Counter
+from functools import partial
+from typing import Iterable, Iterator, TextIO
+
+import disk_index
 
 # Switch between short test dict and full English dict
 DICT_NAME = "dict.txt"
 # DICT_NAME = "shortdict.txt"
 
+# Switch to looking anagrams up in a memory-mapped index file beside the
+# dictionary (built on first use) rather than loading the dictionary.
+# Best when many short-lived processes answer queries.
+ON_DISK = False
+
 def normalize(word: str) -> list[str]:
 	# Returns canonical (alphabetized) list of characters for input
 	"""
@@ -26,7 +40,77 @@ def normalize(word: str) -> list[str]:
 	"""
 	return sorted(word.lower())
 
-def find(canon_anagram: str):
+# Signature index for each dictionary loaded so far:
+# dictionary path -> {signature: [words with that signature]}
+_indexes = {}
+
+# On-disk index for each dictionary opened so far
+_disk_indexes = {}
+
+# Signature tree for each dictionary loaded so far
+_sig_trees = {}
+
+# Key for the words at a signature tree node (never a letter)
+WORDS = "$"
+
+# Blank tile in a jumble: stands for any one letter
+BLANK = "?"
+
+# Shortest word used by find_sub and find_phrases
+MIN_SUB_WORD = 3
+
+# Enough primes for every distinct character of an input (find_phrases)
+PRIMES = [p for p in range(2, 1000) if all(p % d for d in range(2, int(p ** 0.5) + 1))]
+
+def signature(word: str) -> str:
+	# Returns normalized form of word as a string, usable as a dict key
+	"""
+	>>> signature("Gamma")
+	'aagmm'
+
+	>>> signature("magam") == signature("gamma")
+	True
+	"""
+	return "".join(normalize(word))
+
+def load_index(dict_name: str = DICT_NAME) -> dict[str, list[str]]:
+	# Returns index mapping each signature to the words in dict_name having it
+	# Built on first use and kept for later queries
+	"""
+	>>> load_index("shortdict.txt")["aahlp"]
+	['alpha']
+
+	>>> load_index("shortdict.txt") is load_index("shortdict.txt")
+	True
+	"""
+	index = _indexes.get(dict_name)
+	if index is None:
+		index = {}
+		with open(dict_name, "r") as dict_file:
+			for line in dict_file:
+				word = line.strip()
+				index.setdefault(signature(word), []).append(word)
+		_indexes[dict_name] = index
+	return index
+
+def open_disk_index(dict_name: str = DICT_NAME) -> disk_index.DiskIndex:
+	# Returns the memory-mapped index for dict_name,
+	# first (re)building the index file if it is missing or out of date
+	"""
+	>>> open_disk_index("shortdict.txt").lookup("abet")
+	['beta']
+	"""
+	index = _disk_indexes.get(dict_name)
+	if index is None:
+		try:
+			index = disk_index.DiskIndex(dict_name)
+		except (OSError, ValueError):
+			disk_index.write(dict_name, load_index(dict_name))
+			index = disk_index.DiskIndex(dict_name)
+		_disk_indexes[dict_name] = index
+	return index
+
+def find(canon_anagram: list[str], dict_name: str = DICT_NAME, on_disk: bool = ON_DISK) -> list[str]:
 	# Returns list of words in dict matching given normalized anagram
 	"""
 	>>> find(['a', 'e', 'g', 'm', 'o'])
@@ -37,17 +121,242 @@ def find(canon_anagram: str):
 
 	>>> find(['a', 'b', 'e', 't'])
 	['abet', 'bate', 'beat', 'beta']
+
+	>>> find(['q', 'q', 'q'])
+	[]
+
+	>>> find(['a', 'b', 'e', 't'], on_disk=True)
+	['abet', 'bate', 'beat', 'beta']
+
+	>>> find(normalize("bet?"))
+	['abet', 'bate', 'beat', 'beet', 'belt', 'bent', 'best', 'beta', 'bite', 'byte', 'debt', 'tube']
 	"""
-	matches = []
-	dict_file = open(DICT_NAME, "r")
+	if BLANK in canon_anagram:
+		return find_blanks(canon_anagram, dict_name, on_disk)
+	if on_disk:
+		return open_disk_index(dict_name).lookup("".join(canon_anagram))
+	return list(load_index(dict_name).get("".join(canon_anagram), []))
 
-	for line in dict_file:
-		word = line.strip()
-		if normalize(word) == canon_anagram:
-			matches.append(word)
-	return matches
+def load_sig_tree(dict_name: str = DICT_NAME) -> dict:
+	# Returns tree of the dictionary's signatures: each node maps a letter to
+	# the node for the signature extended by that letter, and a node that ends
+	# a signature lists its words under WORDS.  Letters along any path are in
+	# sorted order, as in a signature.
+	"""
+	>>> tree = load_sig_tree("shortdict.txt")
+	>>> tree["a"]["b"]["e"]["t"][WORDS]
+	['beta']
+	"""
+	tree = _sig_trees.get(dict_name)
+	if tree is None:
+		tree = {}
+		for sig, words in load_index(dict_name).items():
+			node = tree
+			for letter in sig:
+				node = node.setdefault(letter, {})
+			node[WORDS] = words
+		_sig_trees[dict_name] = tree
+	return tree
 
-def main():
+def _blank_signatures(letters: str, n_blanks: int, dict_name: str) -> list[str]:
+	# Returns the dictionary signatures made of all of letters (sorted, no
+	# blanks) plus exactly n_blanks other letters.  A signature lists its
+	# letters in order, so walking the signature tree we must use the real
+	# letters in order too: at letter i, a child before letters[i] can only
+	# be a blank, and a child after it can never lead to a match.
+	found = []
+	n_letters = len(letters)
+
+	def visit(node: dict, sig: str, i: int, blanks: int):
+		if i == n_letters and blanks == 0:
+			if WORDS in node:
+				found.append(sig)
+			return
+		for letter, child in node.items():
+			if letter == WORDS:
+				continue
+			if i < n_letters and letter == letters[i]:
+				visit(child, sig + letter, i + 1, blanks)
+			elif blanks > 0 and letter.isalpha() and (i == n_letters or letter < letters[i]):
+				visit(child, sig + letter, i, blanks - 1)
+
+	visit(load_sig_tree(dict_name), "", 0, n_blanks)
+	return found
+
+def find_blanks(canon_anagram: list[str], dict_name: str = DICT_NAME, on_disk: bool = ON_DISK) -> list[str]:
+	# Returns sorted list of words in dict matching a normalized anagram
+	# in which each BLANK may be any letter (but not, e.g., an apostrophe)
+	"""
+	>>> find_blanks(normalize("?lpha"), "shortdict.txt")
+	['alpha']
+
+	>>> find_blanks(normalize("??"), "shortdict.txt")
+	[]
+
+	>>> find_blanks(normalize("ga??a"), on_disk=True) == find_blanks(normalize("ga??a"))
+	True
+	"""
+	n_blanks = canon_anagram.count(BLANK)
+	letters = "".join(letter for letter in canon_anagram if letter != BLANK)
+	words = []
+	if on_disk:
+		# The disk index has no tree to walk; look up every way to fill the blanks
+		index = open_disk_index(dict_name)
+		for fill in itertools.combinations_with_replacement("abcdefghijklmnopqrstuvwxyz", n_blanks):
+			words.extend(index.lookup(signature(letters + "".join(fill))))
+	else:
+		index = load_index(dict_name)
+		for sig in _blank_signatures(letters, n_blanks, dict_name):
+			words.extend(index[sig])
+	return sorted(words)
+
+def _sub_signatures(letters: str, dict_name: str, min_length: int) -> list[str]:
+	# Returns the signatures of dictionary words made from some of letters
+	# (each used at most as often as it appears), at least min_length long.
+	# Walks the signature tree, following only letters still available,
+	# so signatures that cannot be formed are never visited.
+	counts = Counter(signature(letters))
+	found = []
+
+	def visit(node: dict, sig: str):
+		if WORDS in node and len(sig) >= min_length:
+			found.append(sig)
+		for letter, child in node.items():
+			if counts[letter] > 0:
+				counts[letter] -= 1
+				visit(child, sig + letter)
+				counts[letter] += 1
+
+	visit(load_sig_tree(dict_name), "")
+	return found
+
+def find_sub(letters: str, dict_name: str = DICT_NAME, min_length: int = MIN_SUB_WORD) -> list[str]:
+	# Returns sorted list of words in dict using some or all of letters,
+	# each letter no more often than it appears in letters
+	"""
+	>>> find_sub("taebl", "shortdict.txt")
+	['beta']
+
+	>>> find_sub("ahplad", "shortdict.txt")
+	['alpha']
+
+	>>> "stone" in find_sub("onsetx")
+	True
+	"""
+	index = load_index(dict_name)
+	words = []
+	for sig in _sub_signatures(letters, dict_name, min_length):
+		words.extend(index[sig])
+	return sorted(words)
+
+def find_phrases(letters: str, dict_name: str = DICT_NAME, max_words: int = 3,
+		min_length: int = MIN_SUB_WORD) -> list[str]:
+	# Returns sorted list of phrases of up to max_words dictionary words
+	# (each at least min_length long) that together use exactly the letters;
+	# spaces and other non-letters in letters are ignored
+	"""
+	>>> find_phrases("betaalpha", "shortdict.txt")
+	['alpha beta']
+
+	>>> find_phrases("omegagammaalpha", "shortdict.txt")
+	['alpha gamma omega']
+
+	>>> "dirty room" in find_phrases("dormitory", max_words=2)
+	True
+
+	>>> "dormitory" in find_phrases("dirty room", max_words=2)
+	True
+
+	>>> find_phrases("")
+	[]
+	"""
+	letters = signature("".join(filter(str.isalpha, letters)))
+	if not letters:
+		return []
+	index = load_index(dict_name)
+	# A multiset of letters is encoded as the product of a prime for each
+	# letter in it, so "fits in" is divisibility and removing is division
+	primes = dict(zip(sorted(set(letters)), PRIMES))
+
+	def encode(sig: str) -> int:
+		product = 1
+		for letter in sig:
+			product *= primes[letter]
+		return product
+
+	# Candidate words as (signature, code, length), longest first; a phrase
+	# lists them in candidate order so each set of words is found only once
+	candidates = [(sig, encode(sig), len(sig)) for sig in _sub_signatures(letters, dict_name, min_length)]
+	candidates.sort(key=lambda candidate: candidate[2], reverse=True)
+	phrases = []
+
+	def extend(remaining: int, n_remaining: int, n_words: int, usable: list, chosen: list):
+		# usable holds only candidates that fit in the remaining letters
+		if n_remaining == 0:
+			for words in itertools.product(*(index[sig] for sig in chosen)):
+				phrases.append(" ".join(sorted(words)))
+			return
+		if n_words == 0 or len(usable) == 0 or usable[0][2] * n_words < n_remaining:
+			# Out of words, or even the longest left can't cover the letters
+			return
+		for i, (sig, code, length) in enumerate(usable):
+			rest = remaining // code
+			n_rest = n_remaining - length
+			fitting = [candidate for candidate in usable[i:]
+					   if candidate[2] <= n_rest and rest % candidate[1] == 0]
+			extend(rest, n_rest, n_words - 1, fitting, chosen + [sig])
+
+	extend(encode(letters), len(letters), max_words, candidates, [])
+	return sorted(set(phrases))
+
+def resolve(jumble: str, dict_name: str = DICT_NAME, on_disk: bool = ON_DISK) -> str:
+	# Returns one line of batch output for jumble: the jumble, a colon,
+	# and its matches (or "-" if there are none)
+	"""
+	>>> resolve("tbea", "shortdict.txt")
+	'tbea: beta'
+
+	>>> resolve("xyz", "shortdict.txt")
+	'xyz: -'
+	"""
+	matches = find(normalize(jumble), dict_name, on_disk)
+	return f"{jumble}: {' '.join(matches) if matches else '-'}"
+
+def resolve_all(jumbles: Iterable[str], dict_name: str = DICT_NAME, on_disk: bool = ON_DISK,
+		workers: int = 1, chunksize: int = 256) -> Iterator[str]:
+	# Yields resolve output for each jumble (blank lines skipped), in order,
+	# as soon as it is ready.  With workers > 1, a process pool shares the
+	# index loaded here (forked workers inherit it rather than reloading).
+	"""
+	>>> list(resolve_all(["tbea", "", "lapah"], "shortdict.txt"))
+	['tbea: beta', 'lapah: alpha']
+	"""
+	if on_disk:
+		open_disk_index(dict_name)
+	else:
+		load_index(dict_name)
+	jumbles = (jumble.strip() for jumble in jumbles)
+	jumbles = (jumble for jumble in jumbles if jumble)
+	resolve_one = partial(resolve, dict_name=dict_name, on_disk=on_disk)
+	if workers <= 1:
+		yield from map(resolve_one, jumbles)
+		return
+	if "fork" in multiprocessing.get_all_start_methods():
+		pool = multiprocessing.get_context("fork").Pool(workers)
+	else:
+		pool = multiprocessing.Pool(workers)
+	with pool:
+		yield from pool.imap(resolve_one, jumbles, chunksize)
+
+def batch(jumbles: TextIO, out: TextIO, dict_name: str = DICT_NAME, on_disk: bool = ON_DISK,
+		workers: int = 1):
+	# Resolves one jumble per line of jumbles, writing a line per jumble to out
+	for line in resolve_all(jumbles, dict_name, on_disk, workers):
+		out.write(line + "\n")
+	out.flush()
+
+def interactive():
+	# Solves one jumble typed by the user
 	anagram = input("Input jumbled word: ")
 
 	# Store normalized form to compare dictionary words against
@@ -64,6 +373,25 @@ def main():
 		for i in result:
 			print(i)
 
+def main():
+	parser = argparse.ArgumentParser(description="Find dictionary words matching jumbled letters")
+	parser.add_argument("--batch", metavar="FILE",
+			help="resolve one jumble per line of FILE ('-' for stdin), "
+			"writing 'jumble: matches' lines to stdout")
+	parser.add_argument("--workers", type=int, default=1,
+			help="processes to use with --batch (default 1)")
+	parser.add_argument("--dict", default=DICT_NAME, help=f"dictionary (default {DICT_NAME})")
+	parser.add_argument("--on-disk", action="store_true", default=ON_DISK,
+			help="use the memory-mapped index file (see ON_DISK)")
+	args = parser.parse_args()
+	if args.batch is None:
+		interactive()
+	elif args.batch == "-":
+		batch(sys.stdin, sys.stdout, args.dict, args.on_disk, args.workers)
+	else:
+		with open(args.batch) as jumbles:
+			batch(jumbles, sys.stdout, args.dict, args.on_disk, args.workers)
+
 if __name__ == "__main__":
 	main()
 	# Uncomment to run test cases on startup